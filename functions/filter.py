@@ -1,48 +1,223 @@
 import os
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import groupby
 import noisereduce as nr
 import soundfile as sf
 import numpy as np
 from pathlib import Path
 
 from functions.helper.run_san import check_wav_files
+from functions.helper.manifest import VirtualChunk, list_dataset_audio
+from functions.helper.naming import chunk_source
+from functions.helper.ledger import LEDGER_NAME, ProcessingLedger
+
+
+# frames per batch when measuring frame rms; bounds the squared scratch copy for long files
+_RMS_BATCH_FRAMES = 4096
+
+# noisereduce filters independent chunks with zero-padded context on both sides; pinned so the
+# streaming path can feed it the exact same windows
+_NR_CHUNK_SIZE = 600000
+_NR_PADDING = 30000
+
+# longest noise profile built from a whole recording (streamed or pooled across its chunks)
+_NOISE_PROFILE_MAX_SECONDS = 60
 
 
 class NoiseReducer:
-    def __init__(self, input_dir='wavs/'):
+    def __init__(self, input_dir='wavs/', ledger_path=LEDGER_NAME):
         self.input_dir = Path(input_dir)
+        self.ledger = ProcessingLedger(ledger_path)
+        self._ledger_params = None
+        self._profiles = {}
 
     @staticmethod
-    def _estimate_noise_profile(audio, sample_rate, frame_length, hop_length, silence_threshold):
-        """Estimate a noise profile from quiet sections of the audio."""
-        rms_values = []
-        indices = list(range(0, len(audio), hop_length))
+    def _frame_rms(audio, frame_length, hop_length):
+        """RMS of audio[i:i + frame_length] for every i in range(0, len(audio), hop_length)."""
+        n_frames = -(-len(audio) // hop_length)
+        n_full = max(0, (len(audio) - frame_length) // hop_length + 1)
+        rms_values = np.empty(n_frames, dtype=np.result_type(audio.dtype, np.float32))
+
+        # square each batch's span of samples once, then average overlapping frames through a strided view
+        for first in range(0, n_full, _RMS_BATCH_FRAMES):
+            last = min(first + _RMS_BATCH_FRAMES, n_full)
+            squared = audio[first * hop_length:(last - 1) * hop_length + frame_length] ** 2
+            frames = np.lib.stride_tricks.sliding_window_view(squared, frame_length)[::hop_length]
+            rms_values[first:last] = np.sqrt(np.mean(frames, axis=1))
 
-        for i in indices:
-            frame = audio[i:i + frame_length]
-            if len(frame) > 0:
-                rms_values.append(np.sqrt(np.mean(frame ** 2)))
-            else:
-                rms_values.append(0.0)
+        # the last few frames run past the end and are shorter
+        for idx in range(n_full, n_frames):
+            frame = audio[idx * hop_length:idx * hop_length + frame_length]
+            rms_values[idx] = np.sqrt(np.mean(frame ** 2))
+        return rms_values
 
-        rms_values = np.array(rms_values)
+    @staticmethod
+    def _estimate_noise_profile(audio, sample_rate, frame_length, hop_length, silence_threshold):
+        """Estimate a noise profile from quiet sections of the audio."""
+        rms_values = NoiseReducer._frame_rms(audio, frame_length, hop_length)
         max_rms = np.max(rms_values) if rms_values.size > 0 else 0
 
         if max_rms <= 0:
             return audio[:max(frame_length, len(audio) // 10)]
 
-        normalized_rms = rms_values / max_rms
+        quiet = np.flatnonzero(rms_values / max_rms < silence_threshold)
+        if quiet.size == 0:
+            return audio[:max(frame_length, len(audio) // 10)]
+
+        n_full = max(0, (len(audio) - frame_length) // hop_length + 1)
+        full, partial = quiet[quiet < n_full], quiet[quiet >= n_full]
+        # gather overlapping quiet frames back to back, as concatenating the slices would
+        noise_frames = [np.lib.stride_tricks.sliding_window_view(audio, frame_length)[full * hop_length].reshape(-1)] if full.size else []
+        noise_frames += [audio[idx * hop_length:idx * hop_length + frame_length] for idx in partial]
+        return np.concatenate(noise_frames)
+
+    @staticmethod
+    def _reduce_with_profile(audio, sample_rate, noise_profile, frame_length, hop_length, noise_reduction_strength,
+                             chunk_size=_NR_CHUNK_SIZE, padding=_NR_PADDING, stationary=False):
+        # noisereduce only uses y_noise in stationary mode; the default non-stationary gate estimates noise itself
+        return nr.reduce_noise(
+            y=audio,
+            sr=sample_rate,
+            stationary=stationary,
+            y_noise=noise_profile,
+            prop_decrease=noise_reduction_strength,
+            n_fft=frame_length,
+            hop_length=hop_length,
+            chunk_size=chunk_size,
+            padding=padding,
+        )
+
+    @staticmethod
+    def _spectral_gate(audio, sample_rate, chunk_size=_NR_CHUNK_SIZE, padding=_NR_PADDING):
+        return nr.reduce_noise(y=audio, sr=sample_rate, chunk_size=chunk_size, padding=padding)
+
+    @staticmethod
+    def _mono_blocks(file_path, blocksize, overlap):
+        """(start_frame, is_last, mono float32 block) over a file, read the way the whole-file path reads it."""
+        total = sf.info(str(file_path)).frames
+        start = 0
+        for block in sf.blocks(str(file_path), blocksize=blocksize, overlap=overlap, dtype='float64', always_2d=True):
+            yield start, start + len(block) >= total, block.mean(axis=1).astype(np.float32)
+            start += blocksize - overlap
+
+    def _stream_noise_profile(self, file_path, sample_rate, frame_length, hop_length, silence_threshold):
+        """Same quiet-frame selection as _estimate_noise_profile, done in two passes over blocks."""
+        step = _RMS_BATCH_FRAMES * hop_length
+        overlap = max(0, frame_length - hop_length)
+        max_samples = _NOISE_PROFILE_MAX_SECONDS * sample_rate
+
+        # blocks start on frame boundaries and carry enough overlap that every frame is whole in one block
+        rms_values = []
+        for _, is_last, block in self._mono_blocks(file_path, step + overlap, overlap):
+            values = self._frame_rms(block, frame_length, hop_length)
+            rms_values.append(values if is_last else values[:_RMS_BATCH_FRAMES])
+        rms_values = np.concatenate(rms_values) if rms_values else np.empty(0, dtype=np.float32)
+        max_rms = np.max(rms_values) if rms_values.size > 0 else 0
+
+        quiet = np.flatnonzero(rms_values / max_rms < silence_threshold) if max_rms > 0 else np.empty(0, dtype=np.int64)
+        if quiet.size == 0:
+            total = sf.info(str(file_path)).frames
+            data, _ = sf.read(str(file_path), frames=min(max(frame_length, total // 10), max_samples), dtype='float64', always_2d=True)
+            return data.mean(axis=1).astype(np.float32)
+
+        # one profile per file, but never more than a minute of it: spread the pick over the whole recording
+        keep = max(1, max_samples // frame_length)
+        if quiet.size > keep:
+            quiet = quiet[np.linspace(0, quiet.size - 1, keep).astype(np.int64)]
+
         noise_frames = []
-        for idx, i in enumerate(indices):
-            if idx < len(normalized_rms) and normalized_rms[idx] < silence_threshold:
-                noise_frames.append(audio[i:i + frame_length])
+        for start, is_last, block in self._mono_blocks(file_path, step + overlap, overlap):
+            first = start // hop_length
+            in_block = quiet[(quiet >= first) & ((quiet < first + _RMS_BATCH_FRAMES) | is_last)] - first
+            noise_frames += [block[idx * hop_length:idx * hop_length + frame_length] for idx in in_block]
+        return np.concatenate(noise_frames)
+
+    @staticmethod
+    def _read_mono_window(source, start, stop):
+        """Frames [start, stop) of an open SoundFile as mono float64, zero-filled outside the file."""
+        window = np.zeros(stop - start, dtype=np.float64)
+        first, last = max(0, start), min(stop, source.frames)
+        if last > first:
+            source.seek(first)
+            window[first - start:last - start] = source.read(last - first, dtype='float64', always_2d=True).mean(axis=1)
+        return window
+
+    def _stream_denoise(self, file_path, output_path, sample_rate, frame_length, hop_length,
+                        silence_threshold, noise_reduction_strength, use_spectral_gating):
+        """Denoise one padded window at a time; memory does not grow with duration.
+
+        Each window is exactly what noisereduce filters for the matching chunk of the whole-file call,
+        so the overlapping context is discarded and the output matches the whole-file path.
+        """
+        logs = []
+        noise_profile = None
+        if not use_spectral_gating:
+            noise_profile = self._stream_noise_profile(file_path, sample_rate, frame_length, hop_length, silence_threshold)
+            logs.append(f"[DEBUG] Noise profile: {len(noise_profile)} samples from quiet sections")
 
-        if noise_frames:
-            return np.concatenate(noise_frames)
-        return audio[:max(frame_length, len(audio) // 10)]
+        with sf.SoundFile(str(file_path)) as source, \
+                sf.SoundFile(output_path, 'w', samplerate=sample_rate, channels=1, format='WAV') as out:
+            total = source.frames
+            # noisereduce only chunks inputs longer than one chunk; shorter ones are padded as a whole
+            chunk = _NR_CHUNK_SIZE if total > _NR_CHUNK_SIZE else total
+            blocks = 0
+            for start in range(0, total, chunk):
+                window = self._read_mono_window(source, start - _NR_PADDING, start + chunk + _NR_PADDING)
+                if use_spectral_gating:
+                    reduced = self._spectral_gate(window, sample_rate, chunk_size=None, padding=0)
+                else:
+                    reduced = self._reduce_with_profile(
+                        window.astype(np.float32), sample_rate, noise_profile, frame_length, hop_length,
+                        noise_reduction_strength, chunk_size=None, padding=0,
+                    )
+                out.write(reduced[_NR_PADDING:_NR_PADDING + min(chunk, total - start)])
+                blocks += 1
+
+        logs.append(f"[DEBUG] Streaming noise reduction complete ({blocks} blocks)")
+        return logs
+
+    def _process_streaming(self, file_path, frame_length, hop_length, silence_threshold,
+                           noise_reduction_strength, use_spectral_gating):
+        try:
+            info = sf.info(str(file_path))
+        except Exception as e:
+            yield f"[ERROR] Failed to read {file_path.name}: {e}"
+            return
+
+        if info.channels > 1:
+            yield f"[DEBUG] Converting {info.channels}-channel audio to mono"
+        yield f"[DEBUG] Processing: {file_path.name} (sr={info.samplerate}, streaming)"
+
+        if info.frames == 0:
+            yield "[WARNING] Audio file is empty; skipping noise reduction"
+            return
+
+        tmp_path = None
+        try:
+            tmp_fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=file_path.parent)
+            os.close(tmp_fd)
+            if use_spectral_gating:
+                yield "[DEBUG] Using spectral gating for noise reduction"
+            for log in self._stream_denoise(
+                file_path, tmp_path, info.samplerate, frame_length, hop_length,
+                silence_threshold, noise_reduction_strength, use_spectral_gating,
+            ):
+                yield log
+            os.replace(tmp_path, file_path)
+            yield f"[DEBUG] Cleaned: {file_path.name}"
+            yield from self._record_done(file_path)
+        except Exception as e:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            yield f"[ERROR] Noise reduction failed for {file_path.name}: {e}"
+            return
+
+        yield "=====================================\n"
 
     def reduce_noise_single_pass(self, audio_data, sample_rate, frame_length,
-                                  hop_length, silence_threshold, noise_reduction_strength):
+                                  hop_length, silence_threshold, noise_reduction_strength,
+                                  noise_profile=None):
         """Single-pass noise reduction that filters noise while retaining crisp speech."""
         logs = []
         if len(audio_data) == 0:
@@ -54,18 +229,19 @@ class NoiseReducer:
         if np.issubdtype(original_dtype, np.integer):
             audio_float = audio_float / np.iinfo(original_dtype).max
 
-        noise_profile = self._estimate_noise_profile(
-            audio_float, sample_rate, frame_length, hop_length, silence_threshold
-        )
-        logs.append(f"[DEBUG] Noise profile: {len(noise_profile)} samples from quiet sections")
+        shared = noise_profile is not None
+        if not shared:
+            noise_profile = self._estimate_noise_profile(
+                audio_float, sample_rate, frame_length, hop_length, silence_threshold
+            )
+            logs.append(f"[DEBUG] Noise profile: {len(noise_profile)} samples from quiet sections")
+        else:
+            logs.append(f"[DEBUG] Noise profile: {len(noise_profile)} samples shared across the recording (stationary gate)")
 
-        reduced = nr.reduce_noise(
-            y=audio_float,
-            sr=sample_rate,
-            y_noise=noise_profile,
-            prop_decrease=noise_reduction_strength,
-            n_fft=frame_length,
-            hop_length=hop_length,
+        # a shared profile switches to noisereduce's stationary gate, the only mode that gates against a given profile
+        reduced = self._reduce_with_profile(
+            audio_float, sample_rate, noise_profile, frame_length, hop_length, noise_reduction_strength,
+            stationary=shared,
         )
         logs.append("[DEBUG] Single-pass noise reduction complete")
 
@@ -77,12 +253,20 @@ class NoiseReducer:
 
     def process_single_audio_file(self, file_path, frame_length, hop_length,
                                    silence_threshold, noise_reduction_strength,
-                                   use_spectral_gating):
+                                   use_spectral_gating, streaming=False, noise_profile_path=None):
         """Process a single audio file with atomic temp-file writes."""
-        file_path = Path(file_path)
+        virtual = isinstance(file_path, VirtualChunk)
+        if not virtual:
+            file_path = Path(file_path)
+            if streaming:
+                yield from self._process_streaming(
+                    file_path, frame_length, hop_length, silence_threshold,
+                    noise_reduction_strength, use_spectral_gating,
+                )
+                return
 
         try:
-            audio_data, sample_rate = sf.read(file_path)
+            audio_data, sample_rate = file_path.read() if virtual else sf.read(file_path)
         except Exception as e:
             yield f"[ERROR] Failed to read {file_path.name}: {e}"
             return
@@ -94,28 +278,85 @@ class NoiseReducer:
         yield f"[DEBUG] Processing: {file_path.name} (sr={sample_rate})"
 
         try:
-            if use_spectral_gating:
-                yield "[DEBUG] Using spectral gating for noise reduction"
-                reduced_audio = nr.reduce_noise(y=audio_data, sr=sample_rate)
-            else:
-                reduced_audio, reduction_logs = self.reduce_noise_single_pass(
-                    audio_data, sample_rate, frame_length, hop_length,
-                    silence_threshold, noise_reduction_strength,
-                )
-                for log in reduction_logs:
-                    yield log
+            reduced_audio, reduction_logs = self.denoise_array(
+                audio_data, sample_rate, frame_length, hop_length,
+                silence_threshold, noise_reduction_strength, use_spectral_gating,
+                noise_profile=self._load_profile(noise_profile_path),
+            )
+            for log in reduction_logs:
+                yield log
         except Exception as e:
             yield f"[ERROR] Noise reduction failed for {file_path.name}: {e}"
             return
 
+        yield from self.save_reduced(file_path, reduced_audio, sample_rate)
+
+    def denoise_array(self, audio_data, sample_rate, frame_length, hop_length, silence_threshold,
+                      noise_reduction_strength, use_spectral_gating, noise_profile=None):
+        """Denoise a mono array in memory; returns (reduced, logs)."""
+        if use_spectral_gating:
+            return self._spectral_gate(audio_data, sample_rate), ["[DEBUG] Using spectral gating for noise reduction"]
+        return self.reduce_noise_single_pass(
+            audio_data, sample_rate, frame_length, hop_length,
+            silence_threshold, noise_reduction_strength, noise_profile=noise_profile,
+        )
+
+    @staticmethod
+    def ledger_params(frame_length, hop_length, silence_threshold, noise_reduction_strength, spectral_gating,
+                      shared_profile):
+        params = {
+            "frame_length": frame_length,
+            "hop_length": hop_length,
+            "silence_threshold": silence_threshold,
+            "noise_reduction_strength": noise_reduction_strength,
+            "spectral_gating": spectral_gating,
+        }
+        # shared profiles gate with noisereduce's stationary mode, so they are different audio; only added when
+        # on, so ledgers written before the flag existed still match the per-file default
+        if shared_profile:
+            params["shared_profile"] = True
+        return params
+
+    def track_in_ledger(self, params):
+        """Record files saved from now on as denoised with `params`; None stops recording."""
+        self._ledger_params = params
+
+    def _record_done(self, file_path):
+        if self._ledger_params is None:
+            return
+        try:
+            self.ledger.record('denoise', file_path.name, self.ledger.content_hash(file_path), self._ledger_params)
+        except Exception as e:
+            yield f"[WARNING] Could not update {self.ledger.path.name} for {file_path.name}: {e}"
+
+    def _pending_files(self, files, params):
+        """Files whose current content was not produced by a denoise run with the same parameters."""
+        entries = self.ledger.lookup('denoise', (file_path.name for file_path in files))
+        pending = []
+        for file_path in files:
+            try:
+                done = self.ledger.is_done(entries.get(file_path.name), self.ledger.content_hash(file_path), params)
+            except OSError:
+                done = False
+            if not done:
+                pending.append(file_path)
+        return pending
+
+    def save_reduced(self, file_path, reduced_audio, sample_rate):
+        """Write denoised audio over a dataset file (temp file + os.replace), yielding logs."""
+        # a virtual chunk becomes a file of its own next to its source; the shared recording is never rewritten
+        virtual = isinstance(file_path, VirtualChunk)
+        target = file_path.materialized_path if virtual else file_path
+
         # Write to temp file, then atomically replace original
         tmp_path = None
         try:
-            tmp_fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=file_path.parent)
+            tmp_fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=target.parent)
             os.close(tmp_fd)
             sf.write(tmp_path, reduced_audio, sample_rate)
-            os.replace(tmp_path, file_path)
-            yield f"[DEBUG] Cleaned: {file_path.name}"
+            os.replace(tmp_path, target)
+            yield f"[DEBUG] Cleaned: {target.name}" + (" (materialized from virtual chunk)" if virtual else "")
+            yield from self._record_done(target)
         except Exception as e:
             if tmp_path and os.path.exists(tmp_path):
                 os.remove(tmp_path)
@@ -124,33 +365,267 @@ class NoiseReducer:
 
         yield "=====================================\n"
 
+    @staticmethod
+    def _frames_and_rate(file_path):
+        if isinstance(file_path, VirtualChunk):
+            return file_path.end_frame - file_path.start_frame, file_path.info().frame_rate
+        info = sf.info(str(file_path))
+        return info.frames, info.samplerate
+
+    def _process_gated_batches(self, files, batch_size, threads):
+        """Spectral gating with noisereduce's TorchGate, many files per tensor on cpu."""
+        import torch
+        from noisereduce.torchgate import TorchGate
+
+        # the thread count is process-wide; put it back so later torch/ctranslate2 work in the webui is unaffected
+        previous_threads = torch.get_num_threads()
+        try:
+            if threads > 1:
+                torch.set_num_threads(threads)
+            yield f"[DEBUG] Batched spectral gating: up to {batch_size} files per batch, {torch.get_num_threads()} torch threads\n"
+
+            # headers only; files of similar length share a batch so padding stays small
+            sized = []
+            for file_path in files:
+                try:
+                    frames, sample_rate = self._frames_and_rate(file_path)
+                    sized.append((sample_rate, frames, file_path))
+                except Exception as e:
+                    yield f"[ERROR] Failed to read {file_path.name}: {e}"
+            sized.sort(key=lambda item: (item[0], item[1]))
+
+            for sample_rate, group in groupby(sized, key=lambda item: item[0]):
+                # non-stationary, like nr.reduce_noise's default mode in the per-file path
+                gate = TorchGate(sr=sample_rate, nonstationary=True)
+                group = [file_path for _, _, file_path in group]
+                for first in range(0, len(group), batch_size):
+                    yield from self._gate_batch(torch, gate, sample_rate, group[first:first + batch_size])
+        finally:
+            torch.set_num_threads(previous_threads)
+
+    def _gate_batch(self, torch, gate, sample_rate, batch):
+        signals = []
+        for file_path in batch:
+            try:
+                audio_data, _ = file_path.read() if isinstance(file_path, VirtualChunk) else sf.read(file_path)
+            except Exception as e:
+                yield f"[ERROR] Failed to read {file_path.name}: {e}"
+                continue
+            if audio_data.ndim > 1:
+                audio_data = np.mean(audio_data, axis=1)
+            signals.append((file_path, audio_data.astype(np.float32)))
+
+        if not signals:
+            return
+
+        # extra n_fft of silence so the istft output still covers the longest file in full
+        padded = np.zeros((len(signals), max(len(audio) for _, audio in signals) + gate.n_fft), dtype=np.float32)
+        for row, (_, audio) in enumerate(signals):
+            padded[row, :len(audio)] = audio
+        yield f"[DEBUG] Spectral gating {len(signals)} files at sr={sample_rate} (padded to {(padded.shape[1] - gate.n_fft) / sample_rate:.1f}s)"
+
+        try:
+            with torch.inference_mode():
+                reduced = gate(torch.from_numpy(padded)).numpy()
+        except Exception as e:
+            for file_path, _ in signals:
+                yield f"[ERROR] Noise reduction failed for {file_path.name}: {e}"
+            return
+
+        for row, (file_path, audio) in enumerate(signals):
+            yield f"[DEBUG] Processing: {file_path.name} (sr={sample_rate}, batched)"
+            yield from self.save_reduced(file_path, reduced[row, :len(audio)], sample_rate)
+
+    def _load_profile(self, path):
+        # each process loads a shared profile once and reuses it for every chunk of that recording
+        if path is None:
+            return None
+        profile = self._profiles.get(path)
+        if profile is None:
+            profile = self._profiles[path] = np.load(path)
+        return profile
+
+    @staticmethod
+    def _read_mono(file_path):
+        audio_data, sample_rate = file_path.read() if isinstance(file_path, VirtualChunk) else sf.read(file_path)
+        if audio_data.ndim > 1:
+            audio_data = np.mean(audio_data, axis=1)
+        return audio_data.astype(np.float32), sample_rate
+
+    def _pooled_noise_profile(self, members, sample_rate, frame_length, hop_length, silence_threshold):
+        """One profile from the quiet frames of all chunks of a recording, judged against the loudest of them."""
+        rms_values = [self._frame_rms(self._read_mono(member)[0], frame_length, hop_length) for member in members]
+        max_rms = max((np.max(values) for values in rms_values if values.size), default=0)
+        if max_rms <= 0:
+            return None
+
+        quiet = [np.flatnonzero(values / max_rms < silence_threshold) for values in rms_values]
+        total = sum(indices.size for indices in quiet)
+        if total == 0:
+            return None
+
+        # cap the pooled profile, picking frames evenly across the whole recording
+        keep = max(1, _NOISE_PROFILE_MAX_SECONDS * sample_rate // frame_length)
+        if total > keep:
+            picked = np.linspace(0, total - 1, keep).astype(np.int64)
+            offsets = np.cumsum([0] + [indices.size for indices in quiet])
+            quiet = [
+                indices[picked[(picked >= start) & (picked < stop)] - start]
+                for indices, start, stop in zip(quiet, offsets[:-1], offsets[1:])
+            ]
+
+        noise_frames = []
+        for member, indices in zip(members, quiet):
+            if indices.size:
+                audio = self._read_mono(member)[0]
+                noise_frames += [audio[idx * hop_length:idx * hop_length + frame_length] for idx in indices]
+        return np.concatenate(noise_frames)
+
+    def _build_shared_profiles(self, files, profile_dir, frame_length, hop_length, silence_threshold, shared_profiles):
+        """Write one noise profile per chunked recording to profile_dir and map its chunks' names to it."""
+        groups = {}
+        for file_path in files:
+            try:
+                _, sample_rate = self._frames_and_rate(file_path)
+            except Exception as e:
+                yield f"[WARNING] Could not read {file_path.name} for the shared noise profile: {e}"
+                continue
+            groups.setdefault((chunk_source(Path(file_path.name).stem)[0], sample_rate), []).append(file_path)
+
+        for index, ((prefix, sample_rate), members) in enumerate(sorted(groups.items())):
+            if len(members) < 2:
+                # a lone file gets the same profile from the regular per-file estimate
+                continue
+            try:
+                profile = self._pooled_noise_profile(members, sample_rate, frame_length, hop_length, silence_threshold)
+            except Exception as e:
+                yield f"[WARNING] Shared noise profile failed for {prefix}: {e}"
+                continue
+
+            if profile is None:
+                yield f"[DEBUG] No quiet frames across {prefix} ({len(members)} files); profiling each file on its own"
+                continue
+
+            path = str(Path(profile_dir) / f"profile{index}.npy")
+            np.save(path, profile)
+            for member in members:
+                shared_profiles[member.name] = path
+            yield f"[DEBUG] Shared noise profile for {prefix}: {len(profile)} samples pooled from {len(members)} files"
+
+    def _process_file_logs(self, file_path, *params):
+        # worker-side: run one file to completion and hand its logs back in one piece
+        try:
+            return list(self.process_single_audio_file(file_path, *params))
+        except Exception as e:
+            return [f"[ERROR] Failed to process {file_path.name}: {e}"]
+
+    def _process_parallel(self, jobs, workers):
+        pending_files = iter(enumerate(jobs))
+        in_flight = {}
+        finished = {}
+        next_index = 0
+
+        # at most 2 files per worker are decoded/denoised at once, which bounds ram
+        max_in_flight = workers * 2
+
+        def submit_next(executor):
+            item = next(pending_files, None)
+            if item is None:
+                return False
+            index, (file_path, params) = item
+            in_flight[executor.submit(self._process_file_logs, file_path, *params)] = (index, file_path)
+            return True
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while len(in_flight) < max_in_flight and submit_next(executor):
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, file_path = in_flight.pop(future)
+                    try:
+                        finished[index] = future.result()
+                    except Exception as e:
+                        finished[index] = [f"[ERROR] Failed to process {file_path.name}: {e}"]
+                    submit_next(executor)
+
+                # logs come out in file order, each file's block as soon as everything before it is done
+                while next_index in finished:
+                    for log in finished.pop(next_index):
+                        yield log
+                    next_index += 1
+
     def process_audio_files(self, frame_length, hop_length, silence_threshold,
-                            noise_reduction_strength, use_spectral_gating):
+                            noise_reduction_strength, use_spectral_gating, workers=1, streaming=False,
+                            gate_batch_size=1, shared_profile=False, use_ledger=True):
         """Process all WAV files in the input directory."""
         if not self.input_dir.is_dir():
             yield f"[ERROR] Input directory not found: {self.input_dir}"
             return
 
-        files = sorted(
-            p for p in self.input_dir.iterdir()
-            if p.suffix.lower() == '.wav'
-        )
+        files = sorted(list_dataset_audio(self.input_dir), key=lambda p: p.name)
         yield f"[DEBUG] Found {len(files)} files to process.\n"
 
-        for file_path in files:
+        params = (frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating, streaming)
+        workers = min(max(1, int(workers)), max(1, len(files)))
+        batched = use_spectral_gating and not streaming and int(gate_batch_size) > 1
+        if batched:
             try:
-                for log in self.process_single_audio_file(
-                    file_path, frame_length, hop_length, silence_threshold,
-                    noise_reduction_strength, use_spectral_gating,
-                ):
-                    yield log
+                import torch  # noqa: F401
+            except ImportError:
+                yield "[WARNING] PyTorch is not installed; falling back to per-file spectral gating\n"
+                batched = False
+
+        # the shared profile only applies to the per-file noisereduce path
+        shared_profile = bool(shared_profile) and not use_spectral_gating and not streaming
+        self._ledger_params = None
+        if use_ledger:
+            # streaming produces the same audio as the whole-file path, so it is not part of the key
+            self._ledger_params = self.ledger_params(
+                frame_length, hop_length, silence_threshold, noise_reduction_strength,
+                "torchgate" if batched else bool(use_spectral_gating), shared_profile,
+            )
+            try:
+                pending = self._pending_files(files, self._ledger_params)
             except Exception as e:
-                yield f"[ERROR] Failed to process {file_path.name}: {e}"
+                yield f"[WARNING] Could not read {self.ledger.path.name}, processing every file: {e}\n"
+                pending = files
+            if len(pending) < len(files):
+                yield f"[DEBUG] Skipping {len(files) - len(pending)} files already denoised with these settings ({self.ledger.path.name})\n"
+            files = pending
+            workers = min(workers, max(1, len(files)))
+
+        if batched:
+            # one process; the workers become torch intra-op threads instead
+            yield from self._process_gated_batches(files, int(gate_batch_size), workers)
+        else:
+            with tempfile.TemporaryDirectory(prefix='noise_profiles_') as profile_dir:
+                shared_profiles = {}
+                if shared_profile:
+                    yield from self._build_shared_profiles(
+                        files, profile_dir, frame_length, hop_length, silence_threshold, shared_profiles,
+                    )
+                jobs = [(file_path, params + (shared_profiles.get(file_path.name),)) for file_path in files]
+
+                if workers > 1:
+                    yield f"[DEBUG] Denoising with {workers} worker processes\n"
+                    yield from self._process_parallel(jobs, workers)
+                else:
+                    for file_path, file_params in jobs:
+                        try:
+                            for log in self.process_single_audio_file(file_path, *file_params):
+                                yield log
+                        except Exception as e:
+                            yield f"[ERROR] Failed to process {file_path.name}: {e}"
+                self._profiles.clear()
 
+        self._ledger_params = None
         yield f"\n[OK] Finished filtering {len(files)} files."
 
     def gradio_run(self, frame_length, hop_length, silence_threshold,
-                   noise_reduction_strength, use_spectral_gating):
+                   noise_reduction_strength, use_spectral_gating, workers=1, streaming=False, gate_batch_size=1,
+                   shared_profile=False, use_ledger=True):
         if not check_wav_files():
             yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
             return
@@ -158,7 +633,8 @@ class NoiseReducer:
         logs = []
         for log in self.process_audio_files(
             frame_length, hop_length, silence_threshold,
-            noise_reduction_strength, use_spectral_gating,
+            noise_reduction_strength, use_spectral_gating, workers, streaming, gate_batch_size,
+            shared_profile, use_ledger,
         ):
             logs.append(log)
             yield "\n".join(logs)
\ No newline at end of file
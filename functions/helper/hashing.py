@@ -0,0 +1,29 @@
+import hashlib
+
+
+# files are hashed this many bytes at a time
+HASH_BLOCK = 1 << 20
+
+
+def content_hasher():
+    """The hash the ledger, split plan cache and transcript cache key audio content by (20-byte blake2b)."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def update_from_file(hasher, f, size=None):
+    """Feed an open binary file to `hasher` a block at a time, stopping after `size` bytes when given."""
+    remaining = size
+    while remaining is None or remaining > 0:
+        block = f.read(HASH_BLOCK if remaining is None else min(HASH_BLOCK, remaining))
+        if not block:
+            break
+        hasher.update(block)
+        if remaining is not None:
+            remaining -= len(block)
+    return hasher
+
+
+def file_hash(path):
+    """Hex content hash of every byte of the file at `path`."""
+    with open(path, 'rb') as f:
+        return update_from_file(content_hasher(), f).hexdigest()
@@ -8,6 +8,7 @@ class Janitor:
         root_dir = Path(__file__).resolve().parents[2]
         wavs_dir = root_dir / 'wavs'
         metadata_file = root_dir / 'metadata.csv'
+        journal_file = root_dir / 'metadata.csv.journal'
         dataset_file = root_dir / 'output' / 'dataset.zip'
 
         wavs_deleted = 0
@@ -24,6 +25,10 @@ class Janitor:
             metadata_file.unlink()
             metadata_deleted = True
 
+        # an interrupted run's journal describes the deleted wavs
+        if journal_file.is_file():
+            journal_file.unlink()
+
         if dataset_file.is_file():
             dataset_file.unlink()
             dataset_deleted = True
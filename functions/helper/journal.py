@@ -0,0 +1,109 @@
+import os
+import json
+from pathlib import Path
+
+from functions.helper.manifest import VirtualChunk
+
+
+JOURNAL_SUFFIX = '.journal'
+
+
+def _fsync_dir(directory):
+    # makes a newly created file's directory entry durable; not supported on Windows
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def audio_stamp(audio_file):
+    """Size and mtime of the file holding `audio_file` (plus the frame range for virtual chunks)."""
+    if isinstance(audio_file, VirtualChunk):
+        stat = os.stat(audio_file.source)
+        return [stat.st_size, stat.st_mtime_ns, audio_file.start_frame, audio_file.end_frame]
+    stat = os.stat(audio_file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class MetadataJournal:
+    """Append-only, fsynced log of finished transcripts, written next to metadata.csv while a run is in progress.
+
+    The first line holds the ASR settings of the run; every other line is one transcript with the size and
+    mtime its audio had. An interrupted run leaves the journal behind, and the next run with the same settings
+    picks up the entries whose audio is unchanged. A torn last line (crash mid-write) is ignored and cut off.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._valid_bytes = 0
+
+    def load(self, params):
+        """{name: (transcript, language, stamp)} from an earlier run with the same `params`; empty if there is none."""
+        entries = {}
+        self._valid_bytes = 0
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return entries
+
+        with f:
+            offset = 0
+            for line_number, line in enumerate(f):
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if line_number == 0:
+                    if record.get("params") != params:
+                        return {}
+                else:
+                    entries[record["name"]] = (record["transcript"], record["language"], record["stamp"])
+                offset += len(line)
+                self._valid_bytes = offset
+        return entries
+
+    def open(self, params, resume):
+        """Start writing: continue the journal `load` accepted when resuming, otherwise start a new one."""
+        if resume and self._valid_bytes:
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(self._valid_bytes)
+            self._file.seek(self._valid_bytes)
+            return
+
+        self._file = open(self.path, 'wb')
+        self._write([{"params": params}])
+        _fsync_dir(self.path.parent)
+
+    def _write(self, records):
+        self._file.write(b''.join(json.dumps(record).encode('utf-8') + b'\n' for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, entries):
+        """Durably record [(name, transcript, language, stamp)] before returning."""
+        if entries:
+            self._write([
+                {"name": name, "transcript": transcript, "language": language, "stamp": stamp}
+                for name, transcript, language, stamp in entries
+            ])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Remove the journal once metadata.csv holds everything it recorded."""
+        self.close()
+        self.path.unlink(missing_ok=True)
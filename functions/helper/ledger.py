@@ -0,0 +1,79 @@
+import json
+import time
+import sqlite3
+from pathlib import Path
+
+from functions.helper.hashing import content_hasher, file_hash
+from functions.helper.manifest import VirtualChunk
+
+
+LEDGER_NAME = 'ledger.db'
+
+
+class ProcessingLedger:
+    """SQLite record of finished work per dataset file, so repeated runs only touch what changed.
+
+    One row per (stage, file name) holds the content hash the file had when the stage finished,
+    the parameters used and the stage's output (e.g. a transcript). A file is done for a stage
+    when its current hash and the parameters both match.
+    """
+
+    def __init__(self, path=LEDGER_NAME):
+        self.path = Path(path)
+
+    def _connect(self):
+        # a short-lived connection per call keeps the ledger safe to use from worker processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "stage TEXT NOT NULL, name TEXT NOT NULL, content_hash TEXT NOT NULL, "
+            "params TEXT NOT NULL, output TEXT, updated REAL NOT NULL, "
+            "PRIMARY KEY (stage, name))"
+        )
+        return conn
+
+    @staticmethod
+    def content_hash(audio_file):
+        if isinstance(audio_file, VirtualChunk):
+            hasher = content_hasher()
+            hasher.update(audio_file.to_bytes())
+            return hasher.hexdigest()
+        return file_hash(audio_file)
+
+    @staticmethod
+    def _params_key(params):
+        return json.dumps(params, sort_keys=True)
+
+    def lookup(self, stage, names):
+        """{name: (content_hash, params, output)} for the given names that have an entry for `stage`."""
+        names = list(names)
+        found = {}
+        conn = self._connect()
+        try:
+            # sqlite caps the number of bound variables; query in slices
+            for first in range(0, len(names), 500):
+                batch = names[first:first + 500]
+                rows = conn.execute(
+                    f"SELECT name, content_hash, params, output FROM entries WHERE stage = ? AND name IN ({','.join('?' * len(batch))})",
+                    [stage, *batch],
+                )
+                for name, content_hash, params, output in rows:
+                    found[name] = (content_hash, params, json.loads(output) if output is not None else None)
+        finally:
+            conn.close()
+        return found
+
+    def is_done(self, entry, content_hash, params):
+        return entry is not None and entry[0] == content_hash and entry[1] == self._params_key(params)
+
+    def record(self, stage, name, content_hash, params, output=None):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (stage, name, content_hash, params, output, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                    (stage, name, content_hash, self._params_key(params), json.dumps(output) if output is not None else None, time.time()),
+                )
+        finally:
+            conn.close()
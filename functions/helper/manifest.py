@@ -0,0 +1,119 @@
+import io
+import os
+import csv
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import soundfile as sf
+
+from functions.helper.wavio import read_wav_info, wav_header, write_wav_range
+
+
+MANIFEST_NAME = 'chunks.manifest.csv'
+
+
+class VirtualChunk(namedtuple('VirtualChunk', ['name', 'source', 'start_frame', 'end_frame'])):
+    """A `<name>_processedN.wav` chunk that lives as a frame range of its source recording."""
+    __slots__ = ()
+
+    @property
+    def stem(self):
+        return Path(self.name).stem
+
+    @property
+    def suffix(self):
+        return '.wav'
+
+    def info(self):
+        return read_wav_info(self.source)
+
+    def duration(self):
+        info = self.info()
+        return (self.end_frame - self.start_frame) / info.frame_rate
+
+    def read(self, dtype='float64'):
+        """Same (data, sample_rate) result as sf.read on the materialized chunk."""
+        return sf.read(self.source, start=self.start_frame, stop=self.end_frame, dtype=dtype)
+
+    def to_bytes(self):
+        info = self.info()
+        block_align = info.channels * info.sample_width
+        data_size = (self.end_frame - self.start_frame) * block_align
+        available = max(0, min(self.end_frame, info.n_frames) - self.start_frame) * block_align
+
+        with open(self.source, 'rb') as f:
+            f.seek(info.data_offset + self.start_frame * block_align)
+            data = f.read(available)
+        return wav_header(info.channels, info.sample_width, info.frame_rate, data_size) + data + bytes(data_size - len(data))
+
+    def open(self):
+        """File-like WAV of this chunk for readers that expect a file (PyAV, speech_recognition)."""
+        return io.BytesIO(self.to_bytes())
+
+    @property
+    def materialized_path(self):
+        """Where this chunk lives once written out as its own file (it then shadows the manifest entry)."""
+        return Path(self.source).parent / self.name
+
+    def materialize(self, output_path):
+        write_wav_range(self.source, self.info(), output_path, self.start_frame, self.end_frame)
+
+
+class ChunkManifest:
+    def __init__(self, directory='wavs/'):
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+
+    def load(self):
+        if not self.path.is_file():
+            return []
+
+        with open(self.path, newline='') as f:
+            return [
+                VirtualChunk(row['name'], self.directory / row['source'], int(row['start_frame']), int(row['end_frame']))
+                for row in csv.DictReader(f, delimiter='|')
+            ]
+
+    def save(self, entries):
+        # temp file + os.replace so a crash never leaves a half-written manifest
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix='.csv', dir=self.directory)
+        try:
+            with os.fdopen(tmp_fd, 'w', newline='') as f:
+                writer = csv.writer(f, delimiter='|')
+                writer.writerow(['name', 'source', 'start_frame', 'end_frame'])
+                for entry in entries:
+                    writer.writerow([entry.name, os.path.relpath(entry.source, self.directory), entry.start_frame, entry.end_frame])
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def add(self, entries):
+        """Add chunks, replacing any earlier plan for the same source recordings."""
+        sources = {Path(entry.source).name for entry in entries}
+        kept = [entry for entry in self.load() if entry.source.name not in sources]
+        self.save(kept + list(entries))
+
+    def sources(self):
+        return {entry.source.name for entry in self.load()}
+
+
+def list_dataset_audio(directory='wavs/'):
+    """Dataset items in `directory`: plain .wav files plus virtual chunks, minus the recordings they point into."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+
+    entries = ChunkManifest(directory).load()
+    sources = {entry.source.name for entry in entries}
+    wav_files = [
+        p for p in directory.iterdir()
+        if p.is_file() and p.suffix.lower() == '.wav' and p.name not in sources
+    ]
+
+    # a materialized file always wins over a virtual chunk of the same name
+    names = {p.name for p in wav_files}
+    return wav_files + [entry for entry in entries if entry.name not in names]
@@ -0,0 +1,68 @@
+import io
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from functions.helper.manifest import VirtualChunk
+from functions.helper.vad import to_vad_input
+
+
+# whisper (and silero) models take 16 kHz mono float32
+ASR_SAMPLE_RATE = 16000
+
+# files are downmixed this many frames at a time, so only one block is held at the native rate and width
+_LOAD_BLOCK_FRAMES = 1 << 18
+
+
+class InMemoryAudio(namedtuple('InMemoryAudio', ['name', 'samples'])):
+    """A dataset item handed to ASR as a 16 kHz mono float32 array instead of a file on disk."""
+    __slots__ = ()
+
+    @classmethod
+    def from_float(cls, name, audio, sample_rate):
+        """Build from float audio in [-1, 1], mono (n,) or (n, channels), at any sample rate."""
+        audio = np.asarray(audio)
+        if audio.ndim == 1:
+            audio = audio[:, None]
+        return cls(name, to_vad_input(audio, sample_rate, 1.0))
+
+    @classmethod
+    def load(cls, audio_file):
+        """Read and resample a dataset file (path or VirtualChunk) ahead of ASR, downmixing block by block."""
+        if isinstance(audio_file, VirtualChunk):
+            name, path, start, stop = audio_file.name, audio_file.source, audio_file.start_frame, audio_file.end_frame
+        else:
+            name, path, start, stop = Path(audio_file).name, str(audio_file), 0, None
+
+        with sf.SoundFile(path) as f:
+            # same frames as VirtualChunk.read / sf.read: a range past the end is cut short
+            stop = f.frames if stop is None else min(stop, f.frames)
+            mono = np.empty(max(0, stop - start), dtype=np.float32)
+            filled = 0
+            if len(mono):
+                f.seek(start)
+                for block in f.blocks(blocksize=_LOAD_BLOCK_FRAMES, frames=len(mono), dtype='float32', always_2d=True):
+                    mono[filled:filled + len(block)] = block.mean(axis=1, dtype=np.float32)
+                    filled += len(block)
+            sample_rate = f.samplerate
+        return cls.from_float(name, mono[:filled], sample_rate)
+
+    @property
+    def stem(self):
+        return Path(self.name).stem
+
+    @property
+    def suffix(self):
+        return '.wav'
+
+    def duration(self):
+        return len(self.samples) / ASR_SAMPLE_RATE
+
+    def open(self):
+        """File-like 16-bit WAV for readers that expect a file (speech_recognition)."""
+        buffer = io.BytesIO()
+        sf.write(buffer, self.samples, ASR_SAMPLE_RATE, format='WAV', subtype='PCM_16')
+        buffer.seek(0)
+        return buffer
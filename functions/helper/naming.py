@@ -0,0 +1,12 @@
+import re
+
+
+_PROCESSED_RE = re.compile(r'processed(\d+)')
+
+
+def chunk_source(stem):
+    """(lowercased source prefix, chunk number) for a `<name>_processedN` stem; number is None for other files."""
+    match = _PROCESSED_RE.search(stem)
+    if match:
+        return stem[:match.start()].rstrip('_-').lower(), int(match.group(1))
+    return stem.lower(), None
@@ -0,0 +1,55 @@
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+from functions.helper.hashing import file_hash
+
+
+class SplitPlanCache:
+    """On-disk cache of speech regions per source recording.
+
+    Entries are keyed by the file's content hash plus the detection parameters, so changing only the
+    min/max chunk durations reuses the regions and just re-runs the merge step.
+    """
+
+    def __init__(self, cache_dir='cache/split_plans'):
+        self.cache_dir = Path(cache_dir)
+        self._digests = {}
+
+    def content_hash(self, filepath):
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        # hashing a multi-hour file is not free; remember it while the file is unchanged
+        memo_key = (str(filepath.resolve()), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = file_hash(filepath)
+            self._digests[memo_key] = digest
+        return digest
+
+    def key(self, filepath, params):
+        param_digest = hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=8).hexdigest()
+        return f"{self.content_hash(filepath)}-{param_digest}"
+
+    def get(self, key):
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path) as f:
+                return [tuple(region) for region in json.load(f)["regions"]]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, speech_regions):
+        # temp file + os.replace so concurrent split workers never read a partial entry
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix='.json', dir=self.cache_dir)
+        try:
+            with os.fdopen(tmp_fd, 'w') as f:
+                json.dump({"regions": [[int(start), int(end)] for start, end in speech_regions]}, f)
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
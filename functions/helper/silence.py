@@ -0,0 +1,146 @@
+import math
+import numpy as np
+
+
+# frames squared and summed per batch; keeps the float64 scratch buffer small for multi-hour files
+_BATCH_FRAMES = 1 << 20
+
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def sample_dtype(sample_width):
+    dtype = _SAMPLE_DTYPES.get(sample_width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    return dtype
+
+
+def segment_samples(audio):
+    """Return a zero-copy (frames, channels) view of an AudioSegment's PCM data."""
+    return np.frombuffer(audio.raw_data, dtype=sample_dtype(audio.sample_width)).reshape(-1, audio.channels)
+
+
+def frame_index(ms, frame_rate):
+    # mirrors AudioSegment._parse_position: int(ms * (frame_rate / 1000.0))
+    return (np.asarray(ms, dtype=np.int64) * (frame_rate / 1000.0)).astype(np.int64)
+
+
+def _block_square_sums(samples, frame_bounds):
+    """Sum of squared samples (all channels) between consecutive frame bounds."""
+    n_frames = samples.shape[0]
+    sums = np.zeros(len(frame_bounds) - 1, dtype=np.float64)
+    first = 0
+
+    while first < len(frame_bounds) - 1:
+        start = frame_bounds[first]
+        last = int(np.searchsorted(frame_bounds, start + _BATCH_FRAMES, side='right')) - 1
+        last = max(last, first + 1)
+        stop = frame_bounds[last]
+
+        batch = samples[start:min(stop, n_frames)].astype(np.float64)
+        frame_sq = np.einsum('ij,ij->i', batch, batch)
+        # frames past the end are zero padding (pydub pads slices up to 2 ms with silence)
+        cumulative = np.zeros(stop - start + 1, dtype=np.float64)
+        np.cumsum(frame_sq, out=cumulative[1:len(frame_sq) + 1])
+        cumulative[len(frame_sq) + 1:] = cumulative[len(frame_sq)]
+
+        local = frame_bounds[first:last + 1] - start
+        sums[first:last] = np.diff(cumulative[local])
+        first = last
+
+    return sums
+
+
+def dbfs(samples, max_amplitude):
+    """Loudness of a whole (frames, channels) array, matching AudioSegment.dBFS."""
+    total = 0.0
+    for start in range(0, samples.shape[0], _BATCH_FRAMES):
+        batch = samples[start:start + _BATCH_FRAMES].astype(np.float64)
+        total += float(np.einsum('ij,ij->', batch, batch))
+
+    rms = math.floor(math.sqrt(total / samples.size)) if samples.size else 0
+    if not rms:
+        return -float("infinity")
+    return 20 * math.log10(rms / max_amplitude)
+
+
+def _window_rms(samples, channels, frame_rate, start_ms, length_ms):
+    start, end = frame_index([start_ms, start_ms + length_ms], frame_rate)
+    if end <= start:
+        return 0
+    window = samples[start:end].astype(np.float64)
+    return math.floor(math.sqrt(float(np.einsum('ij,ij->', window, window)) / ((end - start) * channels)))
+
+
+def detect_silence(samples, frame_rate, max_amplitude, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """Vectorized equivalent of pydub.silence.detect_silence over a (frames, channels) array."""
+    n_frames, channels = samples.shape
+    seg_len = round(1000 * (n_frames / frame_rate))
+
+    if seg_len < min_silence_len:
+        return []
+
+    threshold = (10 ** (silence_thresh / 20)) * max_amplitude
+    last_slice_start = seg_len - min_silence_len
+
+    # windows are built from blocks of `grain` ms so every window is an exact sum of whole blocks
+    grain = math.gcd(seek_step, min_silence_len)
+    blocks_per_window = min_silence_len // grain
+    blocks_per_step = seek_step // grain
+
+    starts = np.arange(0, last_slice_start + 1, seek_step, dtype=np.int64)
+    block_ms = np.arange(0, starts[-1] + min_silence_len + 1, grain, dtype=np.int64)
+    block_sums = _block_square_sums(samples, frame_index(block_ms, frame_rate))
+
+    window_sums = np.lib.stride_tricks.sliding_window_view(block_sums, blocks_per_window)[::blocks_per_step]
+    window_sums = window_sums.sum(axis=1)[:len(starts)]
+    window_frames = frame_index(starts + min_silence_len, frame_rate) - frame_index(starts, frame_rate)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rms = np.floor(np.sqrt(window_sums / (window_frames * channels)))
+    rms[window_frames == 0] = 0
+    silence_starts = starts[rms <= threshold]
+
+    # guarantee last_slice_start is included so the tail of the audio is searched
+    if last_slice_start % seek_step:
+        if _window_rms(samples, channels, frame_rate, last_slice_start, min_silence_len) <= threshold:
+            silence_starts = np.append(silence_starts, last_slice_start)
+
+    if silence_starts.size == 0:
+        return []
+
+    # a new range begins only where consecutive silent windows are neither adjacent nor overlapping
+    gaps = np.diff(silence_starts)
+    breaks = (gaps != seek_step) & (gaps > min_silence_len)
+    range_starts = np.concatenate(([silence_starts[0]], silence_starts[1:][breaks]))
+    range_ends = np.concatenate((silence_starts[:-1][breaks], [silence_starts[-1]])) + min_silence_len
+
+    return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
+
+
+def detect_nonsilent(samples, frame_rate, max_amplitude, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """Vectorized equivalent of pydub.silence.detect_nonsilent; returns [start_ms, end_ms] pairs."""
+    silent_ranges = detect_silence(samples, frame_rate, max_amplitude, min_silence_len, silence_thresh, seek_step)
+    len_seg = round(1000 * (samples.shape[0] / frame_rate))
+
+    # if there is no silence, the whole thing is nonsilent
+    if not silent_ranges:
+        return [[0, len_seg]]
+
+    # whole segment is silent
+    if silent_ranges[0][0] == 0 and silent_ranges[0][1] == len_seg:
+        return []
+
+    prev_end = 0
+    nonsilent_ranges = []
+    for start, end in silent_ranges:
+        nonsilent_ranges.append([prev_end, start])
+        prev_end = end
+
+    if silent_ranges[-1][1] != len_seg:
+        nonsilent_ranges.append([prev_end, len_seg])
+
+    if nonsilent_ranges[0] == [0, 0]:
+        nonsilent_ranges.pop(0)
+
+    return nonsilent_ranges
@@ -0,0 +1,143 @@
+import json
+import time
+import struct
+import sqlite3
+import hashlib
+from pathlib import Path
+
+from functions.helper.hashing import content_hasher, update_from_file
+from functions.helper.manifest import VirtualChunk
+from functions.helper.wavio import read_wav_info
+
+
+# transcripts are short; 64 MB of entries covers several hundred thousand chunks
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+def pcm_hash(audio_file):
+    """Hash of a file's sample format and PCM data, so the same audio matches under any name or extra header chunks."""
+    hasher = content_hasher()
+    if isinstance(audio_file, VirtualChunk):
+        info = audio_file.info()
+        hasher.update(struct.pack('<HHI', info.channels, info.sample_width, info.frame_rate))
+        # the 44-byte canonical header carries nothing the format tuple does not
+        hasher.update(audio_file.to_bytes()[44:])
+        return hasher.hexdigest()
+
+    try:
+        info = read_wav_info(audio_file)
+    except ValueError:
+        info = None
+
+    with open(audio_file, 'rb') as f:
+        if info is None:
+            # not integer PCM; fall back to the raw file bytes
+            remaining = None
+        else:
+            hasher.update(struct.pack('<HHI', info.channels, info.sample_width, info.frame_rate))
+            f.seek(info.data_offset)
+            remaining = info.data_size
+        update_from_file(hasher, f, remaining)
+    return hasher.hexdigest()
+
+
+class TranscriptCache:
+    """Size-bounded LRU store of transcripts keyed by audio content and ASR settings.
+
+    Unlike the ledger, entries are not tied to a file name: the same audio re-uploaded after a reset, or shared
+    between projects, finds its transcript again. The least recently used entries go once the stored transcripts
+    exceed `max_bytes`.
+    """
+
+    def __init__(self, path='cache/transcripts.db', max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # losing the last few entries to a power cut only costs a re-transcription
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, transcript TEXT NOT NULL, language TEXT, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        # running total, so eviction does not scan the table on every insert
+        conn.execute("CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO usage (id, bytes) VALUES (0, 0)")
+        return conn
+
+    @staticmethod
+    def key(content_hash, params):
+        """Cache key for audio with `content_hash` (see pcm_hash) transcribed with `params` (engine, model, language...)."""
+        return hashlib.blake2b(
+            json.dumps([content_hash, params], sort_keys=True).encode(), digest_size=20,
+        ).hexdigest()
+
+    def get_many(self, keys):
+        """{key: (transcript, language)} for the keys that are cached; marks them as recently used."""
+        keys = list(keys)
+        found = {}
+        conn = self._connect()
+        try:
+            with conn:
+                for first in range(0, len(keys), 500):
+                    batch = keys[first:first + 500]
+                    rows = conn.execute(
+                        f"SELECT key, transcript, language FROM entries WHERE key IN ({','.join('?' * len(batch))})",
+                        batch,
+                    )
+                    for key, transcript, language in rows:
+                        found[key] = (transcript, language)
+                now = time.time()
+                conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, entries):
+        """Store {key: (transcript, language)}, then evict least recently used entries over the size budget."""
+        if not entries:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                now = time.time()
+                added = 0
+                for key, (transcript, language) in entries.items():
+                    size = len(key) + len(transcript.encode('utf-8')) + len(language or '')
+                    row = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, transcript, language, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                        (key, transcript, language, size, now),
+                    )
+                    added += size - (row[0] if row else 0)
+                conn.execute("UPDATE usage SET bytes = bytes + ? WHERE id = 0", (added,))
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        used = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        if used <= self.max_bytes:
+            return
+        excess, victims = used - self.max_bytes, []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append((key,))
+            excess -= size
+            used -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        conn.execute("UPDATE usage SET bytes = ? WHERE id = 0", (used,))
+
+    def usage(self):
+        """Bytes of transcripts currently stored."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,42 @@
+import math
+import numpy as np
+
+
+VAD_SAMPLE_RATE = 16000
+
+
+def to_vad_input(samples, frame_rate, max_amplitude):
+    """Downmix a (frames, channels) pcm array to the 16 kHz mono float32 signal Silero expects."""
+    mono = samples.mean(axis=1, dtype=np.float32)
+    mono /= np.float32(max_amplitude)
+    if frame_rate != VAD_SAMPLE_RATE:
+        from scipy.signal import resample_poly
+
+        g = math.gcd(VAD_SAMPLE_RATE, frame_rate)
+        mono = resample_poly(mono, VAD_SAMPLE_RATE // g, frame_rate // g).astype(np.float32, copy=False)
+    return mono
+
+
+def detect_speech(samples, frame_rate, max_amplitude, min_silence_len=300, speech_pad_ms=100, threshold=0.5):
+    """Speech regions as [start_ms, end_ms] pairs from the Silero VAD model bundled with faster-whisper."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    total_ms = round(1000 * (samples.shape[0] / frame_rate))
+    audio = to_vad_input(samples, frame_rate, max_amplitude)
+
+    # faster-whisper runs the encoder over the whole signal in large onnx batches
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(
+            threshold=threshold,
+            min_silence_duration_ms=min_silence_len,
+            speech_pad_ms=speech_pad_ms,
+        ),
+        sampling_rate=VAD_SAMPLE_RATE,
+    )
+
+    ms_per_sample = 1000 / VAD_SAMPLE_RATE
+    return [
+        [int(stamp["start"] * ms_per_sample), min(total_ms, math.ceil(stamp["end"] * ms_per_sample))]
+        for stamp in speech
+    ]
@@ -0,0 +1,176 @@
+import os
+import mmap
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from functions.helper.silence import sample_dtype
+
+
+WavInfo = namedtuple('WavInfo', ['channels', 'sample_width', 'frame_rate', 'data_offset', 'data_size', 'n_frames'])
+
+_FORMAT_PCM = 0x0001
+_FORMAT_EXTENSIBLE = 0xFFFE
+
+_COPY_BLOCK = 1 << 20
+
+
+def read_wav_info(path):
+    """Parse the RIFF header of a PCM WAV file and locate its data chunk."""
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError(f"{path} is not a RIFF/WAVE file")
+
+        f.seek(0, 2)
+        file_size = f.tell()
+        f.seek(12)
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id = chunk_header[:4]
+            chunk_size = struct.unpack('<I', chunk_header[4:])[0]
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                if chunk_size & 1:
+                    f.seek(1, 1)
+
+            elif chunk_id == b'data':
+                if fmt is None:
+                    break
+                audio_format, channels, frame_rate, _, block_align, _ = struct.unpack('<HHIIHH', fmt[:16])
+                if audio_format == _FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                    audio_format = struct.unpack('<H', fmt[24:26])[0]
+                if audio_format != _FORMAT_PCM:
+                    raise ValueError(f"{path} is not integer PCM (format tag {audio_format:#06x})")
+
+                data_offset = f.tell()
+                # streaming writers often leave the size at 0 or 0xFFFFFFFF; trust the file length instead
+                data_size = min(chunk_size, file_size - data_offset) if chunk_size else file_size - data_offset
+                data_size -= data_size % block_align
+                return WavInfo(
+                    channels=channels,
+                    sample_width=block_align // channels,
+                    frame_rate=frame_rate,
+                    data_offset=data_offset,
+                    data_size=data_size,
+                    n_frames=data_size // block_align,
+                )
+
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+    raise ValueError(f"{path} has no fmt/data chunk")
+
+
+class WavMap:
+    """Read-only memory map of a PCM WAV file's samples as a (frames, channels) array."""
+
+    def __init__(self, path):
+        self.info = read_wav_info(path)
+        # 8-bit wav is unsigned and 24-bit has no numpy dtype; those go through pydub instead
+        if self.info.sample_width not in (2, 4):
+            raise ValueError(f"Unsupported sample width for memory mapping: {self.info.sample_width} bytes")
+        dtype = sample_dtype(self.info.sample_width)
+
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        self.samples = np.frombuffer(
+            self._mmap, dtype=dtype, count=self.info.n_frames * self.info.channels, offset=self.info.data_offset,
+        ).reshape(-1, self.info.channels)
+
+    @property
+    def max_possible_amplitude(self):
+        return (2 ** (self.info.sample_width * 8)) / 2
+
+    def close(self):
+        self.samples = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # a caller still holds a view (e.g. an abandoned generator); the map is released with it
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def wav_header(channels, sample_width, frame_rate, data_size):
+    """44-byte canonical PCM header, identical to what the wave module (and so pydub's export) writes."""
+    return struct.pack(
+        '<4sL4s4sLHHLLHH4sL',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, _FORMAT_PCM, channels, frame_rate,
+        channels * frame_rate * sample_width, channels * sample_width, sample_width * 8,
+        b'data', data_size,
+    )
+
+
+def _copy_range(src, dst, offset, count):
+    """Copy `count` bytes of `src` starting at `offset` to the current position of `dst`, in-kernel where possible."""
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    copied = 0
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < count:
+                n = os.copy_file_range(src_fd, dst_fd, count - copied, offset_src=offset + copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            # EXDEV/ENOSYS/EINVAL on older kernels or some filesystems; try the next method
+            pass
+
+    if copied < count and hasattr(os, 'sendfile'):
+        try:
+            while copied < count:
+                n = os.sendfile(dst_fd, src_fd, offset + copied, count - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass
+
+    src.seek(offset + copied)
+    while copied < count:
+        block = src.read(min(_COPY_BLOCK, count - copied))
+        if not block:
+            break
+        dst.write(block)
+        copied += len(block)
+
+    return copied
+
+
+def write_wav_range(src_path, info, dst_path, start_frame, end_frame):
+    """Write frames [start_frame, end_frame) of a PCM WAV to a new file without decoding the samples.
+
+    Frames past the end of the source are written as silence, like AudioSegment slicing does.
+    """
+    block_align = info.channels * info.sample_width
+    start_frame = max(0, start_frame)
+    data_size = max(0, end_frame - start_frame) * block_align
+    available = max(0, min(end_frame, info.n_frames) - start_frame) * block_align
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb', buffering=0) as dst:
+        dst.write(wav_header(info.channels, info.sample_width, info.frame_rate, data_size))
+        copied = _copy_range(src, dst, info.data_offset + start_frame * block_align, available)
+        if copied < data_size:
+            dst.write(bytes(data_size - copied))
+        if data_size & 1:
+            dst.write(b'\x00')
@@ -1,14 +1,33 @@
 import os
-import re
+import math
+import bisect
 import ctypes
 import site
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import queue
+import itertools
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+import soundfile as sf
 import wave
 import zipfile
 from pathlib import Path
+from pydub import AudioSegment
 
+from functions.helper import silence
 from functions.helper.run_san import check_wav_files
+from functions.helper.manifest import VirtualChunk, list_dataset_audio
+from functions.helper.naming import chunk_source
+from functions.helper.ledger import LEDGER_NAME, ProcessingLedger
+from functions.helper.journal import JOURNAL_SUFFIX, MetadataJournal, audio_stamp
+from functions.helper.memaudio import ASR_SAMPLE_RATE, InMemoryAudio
+from functions.helper.transcript_cache import TranscriptCache, pcm_hash
+from functions.split import AudioSplitter
+from functions.filter import NoiseReducer
 
 
 def _load_pip_cuda_libraries():
@@ -51,11 +70,178 @@ def _load_pip_cuda_libraries():
 _load_pip_cuda_libraries()
 
 
+# loaded models kept between runs, per device: host RAM for CPU models, and separately for each GPU
+MODEL_POOL_RAM_BYTES = 4 << 30
+MODEL_POOL_VRAM_BYTES = 4 << 30
+
+# approximate size of the converted faster-whisper weights, for models not found on disk
+_MODEL_BYTES = {"tiny": 75 << 20, "base": 145 << 20, "small": 484 << 20, "medium": 1530 << 20, "large-v3": 3090 << 20}
+
+
+def _model_bytes(model_size):
+    """Size of a model's weights (model.bin), used to keep the model pool within its budget."""
+    path = model_size if os.path.isdir(model_size) else None
+    if path is None:
+        try:
+            from faster_whisper.utils import download_model
+
+            path = download_model(model_size, local_files_only=True)
+        except Exception:
+            return _MODEL_BYTES.get(model_size, 0)
+    try:
+        return os.path.getsize(os.path.join(path, "model.bin"))
+    except OSError:
+        return _MODEL_BYTES.get(model_size, 0)
+
+
+def _model_device(model):
+    # where a WhisperModel actually landed, whichever device "auto" settled on
+    return "cpu" if model.model.device == "cpu" else f"cuda:{model.model.device_index[0]}"
+
+
+class _PooledModel:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.model = None
+        self.status = ""
+        self.compute_type = None
+        self.device = None
+        self.size = 0
+
+
+class _ModelPool:
+    """Loaded WhisperModels kept for the life of the process, so later runs and warm-ups reuse them.
+
+    Entries are keyed by everything a model is loaded with. Each device has its own budget: `ram_budget_bytes`
+    for the CPU and `vram_budget_bytes` for every GPU. Once a newly loaded model takes its device over budget,
+    the least recently used other models on that device are dropped (a run still using one keeps it alive
+    until it finishes).
+    """
+
+    def __init__(self, ram_budget_bytes=MODEL_POOL_RAM_BYTES, vram_budget_bytes=MODEL_POOL_VRAM_BYTES):
+        self.ram_budget_bytes = ram_budget_bytes
+        self.vram_budget_bytes = vram_budget_bytes
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def budget(self, device):
+        return self.ram_budget_bytes if device == "cpu" else self.vram_budget_bytes
+
+    def set_budgets(self, ram_budget_bytes, vram_budget_bytes):
+        """Change the per-device budgets, dropping models that no longer fit."""
+        with self.lock:
+            self.ram_budget_bytes = ram_budget_bytes
+            self.vram_budget_bytes = vram_budget_bytes
+            # the most recently used model on each device stays, as it does after a load
+            latest = {entry.device: key for key, entry in self._entries.items() if entry.model is not None}
+        for device, key in latest.items():
+            self._evict(device, keep=key)
+
+    def get(self, key, load):
+        """The pooled entry for `key`; `load()` -> (model, status, compute_type) runs on first use only."""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _PooledModel()
+            self._entries.move_to_end(key)
+
+        # concurrent callers for the same key wait here for one load instead of each loading a copy
+        with entry.lock:
+            if entry.model is None:
+                try:
+                    entry.model, entry.status, entry.compute_type = load()
+                except Exception:
+                    with self.lock:
+                        if self._entries.get(key) is entry:
+                            del self._entries[key]
+                    raise
+                entry.size = _model_bytes(key[0])
+                entry.device = _model_device(entry.model)
+                self._evict(entry.device, keep=key)
+        return entry
+
+    def _evict(self, device, keep):
+        with self.lock:
+            on_device = [key for key, entry in self._entries.items() if entry.model is not None and entry.device == device]
+            used = sum(self._entries[key].size for key in on_device)
+            for key in on_device:
+                if used <= self.budget(device):
+                    break
+                if key == keep:
+                    continue
+                used -= self._entries.pop(key).size
+
+    def resident(self):
+        """[(model_size, device, compute_type, bytes)] of the loaded models, least recently used first."""
+        with self.lock:
+            return [
+                (key[0], entry.device, entry.compute_type, entry.size)
+                for key, entry in self._entries.items() if entry.model is not None
+            ]
+
+
+_MODEL_POOL = _ModelPool()
+
+
+class _SharedModel:
+    """CPU workers of one run that share a WhisperModel (CTranslate2 `num_workers`) from the model pool."""
+
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+
+
+class _LanguagePins:
+    """Language detections per source recording, shared by the workers of one run.
+
+    A source's language is pinned once `samples` of its chunks were detected as the same language with at
+    least `confidence`; its other chunks then skip detection. Sources with confident detections of two
+    different languages are never pinned.
+    """
+
+    def __init__(self, samples, confidence):
+        self.samples = samples
+        self.confidence = confidence
+        self.lock = threading.Lock()
+        self.pinned = {}
+        self.skipped = 0
+        self._votes = {}
+
+    def get(self, source):
+        with self.lock:
+            return self.pinned.get(source)
+
+    def skip(self, count=1):
+        """Note `count` detections saved by a pin."""
+        with self.lock:
+            self.skipped += count
+
+    def vote(self, source, language, probability):
+        """Count one detection for `source`; returns the language if this detection pinned it."""
+        if language is None or probability < self.confidence:
+            return None
+        with self.lock:
+            if source in self.pinned:
+                return None
+            votes = self._votes.setdefault(source, {})
+            votes[language] = votes.get(language, 0) + 1
+            if len(votes) == 1 and votes[language] >= self.samples:
+                self.pinned[source] = language
+                del self._votes[source]
+                return language
+        return None
+
+
 class ASREngine:
     ENGINE_LOCAL = "Local (faster-whisper)"
     ENGINE_GOOGLE = "Google Speech API"
     AVAILABLE_ENGINES = [ENGINE_LOCAL, ENGINE_GOOGLE]
 
+    PACK_WINDOW_SECONDS = 30  # whisper pads every input to 30 s
+    PACK_GAP_SECONDS = 1.0  # silence between packed clips, where their text is split back apart
+    # agreeing detections (at this probability) before a source recording's language is pinned
+    LANGUAGE_PIN_SAMPLES = 3
+    LANGUAGE_PIN_CONFIDENCE = 0.8
+
     MODEL_SIZES = ["tiny", "base", "small", "medium", "large-v3"]
     DEVICES = ["auto", "cpu", "cuda"]
     COMPUTE_TYPES = ["auto", "int8", "int8_float16", "int8_float32", "int16", "float16", "float32"]
@@ -81,8 +267,14 @@ class ASREngine:
         self.compute_type = "auto"
         self.cpu_workers = max(1, os.cpu_count() or 1)
         self.gpu_workers_per_device = 1
+        self.batch_size = 1  # speech segments batched across files; 1 transcribes file by file
+        self.pack_windows = False  # concatenate short files into 30 s windows
+        self.pin_language = True  # with auto-detect, stop detecting once a source recording's language is clear
         self._model = None
         self._batched_pipeline = None
+        self._shared_model = None
+        self._model_replica = 0
+        self._language_pins = None
 
     def configure(
         self,
@@ -94,6 +286,9 @@ class ASREngine:
         cpu_workers=None,
         gpu_workers_per_device=None,
         device_index=0,
+        batch_size=None,
+        pack_windows=None,
+        pin_language=None,
     ):
         needs_reload = (
             self.engine != engine
@@ -116,6 +311,12 @@ class ASREngine:
             self.cpu_workers = max(1, int(cpu_workers))
         if gpu_workers_per_device is not None:
             self.gpu_workers_per_device = max(1, int(gpu_workers_per_device))
+        if batch_size is not None:
+            self.batch_size = max(1, int(batch_size))
+        if pack_windows is not None:
+            self.pack_windows = bool(pack_windows)
+        if pin_language is not None:
+            self.pin_language = bool(pin_language)
 
     @staticmethod
     def detect_cuda_device_indices():
@@ -146,6 +347,9 @@ class ASREngine:
             cpu_workers=self.cpu_workers,
             gpu_workers_per_device=self.gpu_workers_per_device,
             device_index=self.device_index,
+            batch_size=self.batch_size,
+            pack_windows=self.pack_windows,
+            pin_language=self.pin_language,
         )
         return clone_engine
 
@@ -153,7 +357,49 @@ class ASREngine:
         total_cores = max(1, os.cpu_count() or 1)
         return max(1, total_cores // max(1, self.cpu_workers))
 
+    def share_model(self, shared_model):
+        """Use `shared_model` (loaded by whichever worker needs it first) instead of loading a private copy."""
+        self._shared_model = shared_model
+
+    def use_model_replica(self, replica):
+        """Load pooled model copy number `replica`, so several workers on one GPU do not share a model."""
+        self._model_replica = replica
+
+    def share_language_pins(self, language_pins):
+        """Pin languages per source recording in `language_pins`, shared with the other workers of the run."""
+        self._language_pins = language_pins
+
+    def _pool_key(self):
+        # everything _load_model hands to WhisperModel, plus the copy number for GPU workers
+        shared_workers = self._shared_model.num_workers if self._shared_model is not None else 1
+        cpu_threads = self._cpu_threads_per_worker() if self.device in {"auto", "cpu"} else 0
+        return (self.model_size, self.device, self.compute_type, self.device_index, cpu_threads, shared_workers, self._model_replica)
+
     def _ensure_model(self):
+        if self._model is not None:
+            return
+
+        from faster_whisper import BatchedInferencePipeline
+
+        def load():
+            self._load_model()
+            return self._model, self._device_status, self.compute_type
+
+        entry = _MODEL_POOL.get(self._pool_key(), load)
+        self._model = entry.model
+        self.compute_type = entry.compute_type
+        self._device_status = entry.status
+        if self._shared_model is not None:
+            self._device_status += f" (shared by {self._shared_model.num_workers} workers)"
+        # the pipeline keeps per-call state, so each worker gets its own over the shared weights
+        self._batched_pipeline = BatchedInferencePipeline(model=self._model)
+
+    def warm_up(self):
+        """Load this worker's model into the model pool now rather than on its first file."""
+        if self.engine == self.ENGINE_LOCAL:
+            self._ensure_model()
+
+    def _load_model(self):
         if self._model is None:
             from faster_whisper import WhisperModel, BatchedInferencePipeline
 
@@ -238,6 +484,9 @@ class ASREngine:
                 else:
                     if device == "cpu":
                         model_kwargs["cpu_threads"] = self._cpu_threads_per_worker()
+                        if self._shared_model is not None:
+                            # one copy of the weights; concurrent transcribe calls run on its internal workers
+                            model_kwargs["num_workers"] = self._shared_model.num_workers
                     self._model = WhisperModel(
                         self.model_size, device=device, compute_type=compute_type,
                         **model_kwargs,
@@ -263,17 +512,56 @@ class ASREngine:
 
         return any(marker in message for marker in cuda_error_markers)
 
+    @staticmethod
+    def _audio_input(audio_file):
+        # decoded audio goes straight to faster-whisper, which takes 16 kHz float32 arrays
+        if isinstance(audio_file, InMemoryAudio):
+            return audio_file.samples
+        return ASREngine._audio_file(audio_file)
+
+    @staticmethod
+    def _audio_file(audio_file):
+        # virtual chunks are handed over as an in-memory wav of their frame range
+        if isinstance(audio_file, (VirtualChunk, InMemoryAudio)):
+            return audio_file.open()
+        return str(audio_file)
+
+    @staticmethod
+    def _audio_name(audio_file):
+        return audio_file.name if isinstance(audio_file, (VirtualChunk, InMemoryAudio)) else Path(audio_file).name
+
+    def _language_pin(self, audio_file):
+        """(source recording, its pinned language or None); (None, None) when pinning does not apply."""
+        if self.language is not None or self._language_pins is None:
+            return None, None
+        source, number = chunk_source(Path(self._audio_name(audio_file)).stem)
+        if number is None:
+            return None, None
+        return source, self._language_pins.get(source)
+
+    def _vote_language(self, source, language, probability, logs):
+        if source is None:
+            return
+        if self._language_pins.vote(source, language, probability):
+            logs.append(f"[DEBUG] Pinned language {language} for {source} after {self._language_pins.samples} confident detections")
+
     def _consume_transcribe_result(self, audio_file, name, logs):
         detected_language = None
+        source, pinned = self._language_pin(audio_file)
         segments, info = self._batched_pipeline.transcribe(
-            str(audio_file),
+            self._audio_input(audio_file),
             batch_size=16,
-            language=self.language,
+            language=self.language or pinned,
         )
         detected_language = info.language
-        logs.append(
-            f"[DEBUG] Language: {detected_language} ({info.language_probability:.0%})"
-        )
+        if pinned:
+            self._language_pins.skip()
+            logs.append(f"[DEBUG] Language: {pinned} (pinned for {source})")
+        else:
+            logs.append(
+                f"[DEBUG] Language: {detected_language} ({info.language_probability:.0%})"
+            )
+            self._vote_language(source, detected_language, info.language_probability, logs)
         transcript = " ".join(seg.text for seg in segments).strip()
         if transcript:
             logs.append(f"[DEBUG] Transcript: {transcript}")
@@ -284,6 +572,188 @@ class ASREngine:
 
         return transcript, detected_language
 
+    def _decode(self, audio_file):
+        from faster_whisper.audio import decode_audio
+
+        audio = self._audio_input(audio_file)
+        if isinstance(audio, np.ndarray):
+            return audio
+        return decode_audio(audio, sampling_rate=ASR_SAMPLE_RATE)
+
+    def _speech_chunks(self, audio):
+        """Speech as the batched pipeline would cut it: VAD regions merged into <=30 s clips of 16 kHz audio."""
+        from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
+
+        chunk_length = self._model.feature_extractor.chunk_length
+        speech = get_speech_timestamps(audio, VadOptions(max_speech_duration_s=chunk_length, min_silence_duration_ms=160))
+        chunks, _ = collect_chunks(audio, speech, max_duration=chunk_length)
+        return [chunk for chunk in chunks if len(chunk)]
+
+    def _detect_chunk_language(self, chunks):
+        # same features and dummy frame the pipeline uses when it detects the language of one file
+        if not self._model.model.is_multilingual:
+            return "en", 1.0
+        features = [self._model.feature_extractor(chunk)[..., :-1] for chunk in chunks]
+        features.append(np.full((self._model.model.n_mels, 1), -1.5, dtype="float32"))
+        language, probability, _ = self._model.detect_language(features=np.concatenate(features, axis=1))
+        return language, probability
+
+    def _pack_windows(self, parts):
+        """Pack [(key, audio)] parts in order into windows of up to PACK_WINDOW_SECONDS, PACK_GAP_SECONDS of
+        silence apart; returns [(window audio, [(key, start_s, end_s), ...])]."""
+        limit = int(self.PACK_WINDOW_SECONDS * ASR_SAMPLE_RATE) - 1
+        gap = np.zeros(int(self.PACK_GAP_SECONDS * ASR_SAMPLE_RATE), dtype=np.float32)
+        windows = []
+        pieces, members, length = [], [], 0
+        for key, audio in parts:
+            audio = audio[:limit]
+            if pieces and length + len(gap) + len(audio) > limit:
+                windows.append((np.concatenate(pieces), members))
+                pieces, members, length = [], [], 0
+            if pieces:
+                pieces.append(gap)
+                length += len(gap)
+            members.append((key, length / ASR_SAMPLE_RATE, (length + len(audio)) / ASR_SAMPLE_RATE))
+            pieces.append(audio)
+            length += len(audio)
+        if pieces:
+            windows.append((np.concatenate(pieces), members))
+        return windows
+
+    def _transcribe_clips(self, clips, language, word_timestamps=False):
+        """Transcribe 16 kHz clips in batches of `batch_size`; returns one list of segments per clip.
+
+        Clips are laid out on whole-second boundaries of one buffer and passed as clip timestamps, so
+        faster-whisper cuts out exactly these samples and every generate call sees a full batch. Segments
+        are (start_s, end_s, text, [(start_s, end_s, word), ...]) relative to their clip.
+        """
+        starts, total = [], 0
+        for audio in clips:
+            starts.append(total)
+            total += math.ceil(len(audio) / ASR_SAMPLE_RATE)
+        buffer = np.zeros(total * ASR_SAMPLE_RATE, dtype=np.float32)
+        clip_timestamps = []
+        clip_at = {}
+        for idx, (start, audio) in enumerate(zip(starts, clips)):
+            buffer[start * ASR_SAMPLE_RATE:start * ASR_SAMPLE_RATE + len(audio)] = audio
+            # half a sample of slack so the seconds -> samples conversion never drops the last one
+            clip_timestamps.append({"start": start, "end": start + (len(audio) + 0.5) / ASR_SAMPLE_RATE})
+            clip_at[start * self._model.frames_per_second] = idx
+
+        segments, _ = self._batched_pipeline.transcribe(
+            buffer,
+            batch_size=self.batch_size,
+            language=language,
+            clip_timestamps=clip_timestamps,
+            word_timestamps=word_timestamps,
+        )
+        results = [[] for _ in clips]
+        for segment in segments:
+            idx = clip_at[segment.seek]
+            offset = starts[idx]
+            words = [(word.start - offset, word.end - offset, word.word) for word in segment.words or []]
+            results[idx].append((segment.start - offset, segment.end - offset, segment.text, words))
+        return results
+
+    @staticmethod
+    def _split_window_text(segments, members):
+        """Give each packed member the words whose midpoint falls on its side of the silence separators."""
+        if len(members) == 1:
+            return [" ".join(text for _, _, text, _ in segments).strip()]
+
+        bounds = [(end + next_start) / 2 for (_, _, end), (_, next_start, _) in zip(members, members[1:])]
+        texts = [[] for _ in members]
+        for start, end, text, words in segments:
+            # a segment without word timings goes to one member as a whole
+            for word_start, word_end, word in words or [(start, end, text)]:
+                texts[bisect.bisect(bounds, (word_start + word_end) / 2)].append(word)
+        return ["".join(words).strip() for words in texts]
+
+    def _consume_batch_result(self, audio_file, name, logs):
+        """Transcribe several files together; returns [(transcript, language, logs), ...] in input order.
+
+        Batching groups the speech clips of all files by language into generate calls of `batch_size`.
+        Packing also concatenates short clips into ~30 s windows, so one encoder pass covers several files,
+        and splits the window text back at the silence separators by word timings.
+        """
+        audio_files = audio_file
+        mode = "packed" if self.pack_windows else "batched"
+        results = [[None, self.language, []] for _ in audio_files]
+        parts = []
+        for idx, item in enumerate(audio_files):
+            file_logs = results[idx][2]
+            file_logs.append(f"[DEBUG] Transcribing ({self.model_size}, {mode}): {self._audio_name(item)}")
+            try:
+                audio = self._decode(item)
+                # short chunks were already cut at silence; longer files keep the pipeline's VAD clips
+                if self.pack_windows and len(audio) <= self.PACK_WINDOW_SECONDS * ASR_SAMPLE_RATE:
+                    chunks = [audio] if len(audio) else []
+                else:
+                    chunks = self._speech_chunks(audio)
+                if chunks and self.language is None and not self.pack_windows:
+                    source, pinned = self._language_pin(item)
+                    if pinned:
+                        self._language_pins.skip()
+                        results[idx][1] = pinned
+                        file_logs.append(f"[DEBUG] Language: {pinned} (pinned for {source})")
+                    else:
+                        language, probability = self._detect_chunk_language(chunks)
+                        results[idx][1] = language
+                        file_logs.append(f"[DEBUG] Language: {language} ({probability:.0%})")
+                        self._vote_language(source, language, probability, file_logs)
+            except Exception as e:
+                file_logs.append(f"[ERROR] Transcription failed for {self._audio_name(item)}: {e}")
+                continue
+            results[idx][0] = {}
+            parts.extend(((idx, len(parts) + n), chunk) for n, chunk in enumerate(chunks))
+
+        if self.pack_windows:
+            clips = self._pack_windows(parts)
+        else:
+            clips = [(chunk, [(key, 0.0, len(chunk) / ASR_SAMPLE_RATE)]) for key, chunk in parts]
+
+        by_language = {}
+        for number, (audio, members) in enumerate(clips, start=1):
+            language = results[members[0][0][0]][1]
+            if self.pack_windows:
+                note = ""
+                if self.language is None:
+                    pins = {self._language_pin(audio_files[idx]) for (idx, _), _, _ in members}
+                    (source, pinned), = pins if len(pins) == 1 else [(None, None)]
+                    if pinned:
+                        self._language_pins.skip(len(members))
+                        language = pinned
+                        note = f", language: {pinned} (pinned for {source})"
+                    else:
+                        # packed files share one detection per window; it counts toward a pin when they share a source
+                        language, probability = self._detect_chunk_language([audio])
+                        note = f", language: {language} ({probability:.0%})"
+                        self._vote_language(source, language, probability, results[members[0][0][0]][2])
+                for (idx, _), _, _ in members:
+                    results[idx][1] = language
+                    results[idx][2].append(
+                        f"[DEBUG] Packed into window {number} ({len(members)} clips, {len(audio) / ASR_SAMPLE_RATE:.1f} s){note}"
+                    )
+            by_language.setdefault(language, []).append((audio, members))
+
+        for language, group in by_language.items():
+            transcribed = self._transcribe_clips([audio for audio, _ in group], language, word_timestamps=self.pack_windows)
+            for (_, members), segments in zip(group, transcribed):
+                for ((idx, position), _, _), text in zip(members, self._split_window_text(segments, members)):
+                    results[idx][0][position] = text
+
+        finished = []
+        for (texts, language, file_logs), item in zip(results, audio_files):
+            transcript = " ".join(text for _, text in sorted((texts or {}).items()) if text).strip()
+            if transcript:
+                file_logs.append(f"[DEBUG] Transcript: {transcript}")
+            else:
+                if not file_logs[-1].startswith("[ERROR]"):
+                    file_logs.append(f"[WARNING] Empty transcript for {self._audio_name(item)}")
+                transcript = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
+            finished.append((transcript, language, file_logs))
+        return finished
+
     def _activate_cpu_fallback(self, logs):
         from faster_whisper import WhisperModel, BatchedInferencePipeline
 
@@ -303,17 +773,13 @@ class ASREngine:
             return self._transcribe_local(audio_file)
         return self._transcribe_google(audio_file)
 
-    def _transcribe_local(self, audio_file):
-        logs = []
-        detected_language = None
-        name = Path(audio_file).name
-        logs.append(f"[DEBUG] Transcribing ({self.model_size}): {name}")
+    def _run_local(self, consume, audio_file, name, logs):
         try:
             self._ensure_model()
             if self._device_status:
                 logs.append(self._device_status)
 
-            transcript, detected_language = self._consume_transcribe_result(
+            return consume(
                 audio_file=audio_file,
                 name=name,
                 logs=logs,
@@ -327,32 +793,99 @@ class ASREngine:
 
                 try:
                     self._activate_cpu_fallback(logs)
-                    transcript, detected_language = self._consume_transcribe_result(
+                    return consume(
                         audio_file=audio_file,
                         name=name,
                         logs=logs,
                     )
 
-                    return transcript, detected_language, logs
-                
                 except Exception as cpu_fallback_error:
                     logs.append(
                         f"[ERROR] CPU fallback also failed for {name}: {cpu_fallback_error}"
                     )
 
+            raise
+
+    def _transcribe_local(self, audio_file):
+        logs = []
+        detected_language = None
+        name = self._audio_name(audio_file)
+        logs.append(f"[DEBUG] Transcribing ({self.model_size}): {name}")
+        try:
+            transcript, detected_language = self._run_local(self._consume_transcribe_result, audio_file, name, logs)
+
+        except Exception as e:
             logs.append(f"[ERROR] Transcription failed for {name}: {e}")
             transcript = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
         return transcript, detected_language, logs
 
+    def transcribe_batch(self, audio_files):
+        """Transcribe several files with their speech batched or packed together; returns [(transcript, language, logs), ...]."""
+        audio_files = list(audio_files)
+        combined = self.batch_size > 1 or self.pack_windows
+        if self.engine != self.ENGINE_LOCAL or not combined or len(audio_files) <= 1:
+            return [self.transcribe(audio_file) for audio_file in audio_files]
+
+        logs = []
+        name = f"batch of {len(audio_files)} files"
+        try:
+            results = self._run_local(self._consume_batch_result, audio_files, name, logs)
+        except Exception as e:
+            logs.append(f"[ERROR] Transcription failed for {name}: {e}")
+            return [
+                ("**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**", None, logs if idx == 0 else [])
+                for idx in range(len(audio_files))
+            ]
+        # engine status and fallback notes go with the first file of the batch
+        results[0] = (results[0][0], results[0][1], logs + results[0][2])
+        return results
+
+    def _consume_word_result(self, audio_file, name, logs):
+        segments, info = self._batched_pipeline.transcribe(
+            self._audio_input(audio_file),
+            batch_size=16,
+            language=self.language,
+            word_timestamps=True,
+        )
+        logs.append(
+            f"[DEBUG] Language: {info.language} ({info.language_probability:.0%})"
+        )
+        words = [
+            (word.start, word.end, word.word)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        if not words:
+            logs.append(f"[WARNING] No words recognized in {name}")
+
+        return words, info.language
+
+    def transcribe_words(self, audio_file):
+        """Long-form pass with word timings: returns ([(start_s, end_s, word), ...], language, logs)."""
+        logs = []
+        name = self._audio_name(audio_file)
+        if self.engine != self.ENGINE_LOCAL:
+            logs.append(f"[ERROR] Word timestamps need the {self.ENGINE_LOCAL} engine, skipping {name}")
+            return None, None, logs
+
+        logs.append(f"[DEBUG] Transcribing with word timestamps ({self.model_size}): {name}")
+        try:
+            words, detected_language = self._run_local(self._consume_word_result, audio_file, name, logs)
+
+        except Exception as e:
+            logs.append(f"[ERROR] Transcription failed for {name}: {e}")
+            return None, None, logs
+        return words, detected_language, logs
+
     def _transcribe_google(self, audio_file):
         import speech_recognition as sr
         logs = []
-        name = Path(audio_file).name
+        name = self._audio_name(audio_file)
         logs.append(f"[DEBUG] Transcribing (Google API): {name}")
         recognizer = sr.Recognizer()
         detected_language = None
         try:
-            with sr.AudioFile(str(audio_file)) as source:
+            with sr.AudioFile(self._audio_file(audio_file)) as source:
                 audio_data = recognizer.record(source)
                 transcript = recognizer.recognize_google(audio_data)
                 logs.append(f"[DEBUG] Transcript: {transcript}")
@@ -369,40 +902,51 @@ class ASREngine:
 
 
 class MainProcess:
+    PLAN_WAVE = 256  # files hashed, sized and ordered at a time before their jobs are queued
+    PREFETCH_WORKERS = 2  # threads decoding upcoming files to 16 kHz arrays while the workers transcribe
+    PREFETCH_MAX_SECONDS = 1800  # decoded audio held ahead of the workers at once (16 kHz float32, ~115 MB)
+    PREFETCH_MAX_FILE_SECONDS = 600  # longer files are decoded by the worker itself instead of held in memory
+    # silence kept around the first/last word of a chunk cut from word timestamps
+    WORD_PAD_MS = 200
+
     def __init__(self, input_dir='wavs', metadata_file='metadata.csv', output_dir='output'):
         self.input_dir = Path(input_dir)
         self.metadata_file = Path(metadata_file)
         self.output_dir = Path(output_dir)
         self.asr = ASREngine()
+        self.ledger = ProcessingLedger(self.metadata_file.with_name(LEDGER_NAME))
+        self.transcript_cache = TranscriptCache()
 
     @staticmethod
     def _sort_key(wav_path):
-        match = re.search(r'processed(\d+)', wav_path.stem)
-        if match:
-            prefix = wav_path.stem[:match.start()].rstrip('_-').lower()
-            return (prefix, 0, int(match.group(1)), wav_path.name.lower())
-        return (wav_path.stem.lower(), 1, 0, wav_path.name.lower())
+        prefix, number = chunk_source(wav_path.stem)
+        if number is not None:
+            return (prefix, 0, number, wav_path.name.lower())
+        return (prefix, 1, 0, wav_path.name.lower())
 
     def _get_wav_files(self, directory):
-        directory = Path(directory)
-        return sorted(
-            [p for p in directory.iterdir() if p.is_file() and p.suffix.lower() == '.wav'],
-            key=self._sort_key,
-        )
+        return sorted(list_dataset_audio(directory), key=self._sort_key)
 
-    def _build_asr_workers(self, total_files):
-        if self.asr.engine != ASREngine.ENGINE_LOCAL:
-            worker_count = min(max(1, self.asr.cpu_workers), max(1, total_files))
-            workers = [self.asr.clone() for _ in range(worker_count)]
-            return workers, f"[DEBUG] Using {worker_count} API worker(s)."
+    def _build_asr_workers(self, total_files, asr=None):
+        """(workers, status line, language pins shared by the workers or None) for a run over `total_files` files."""
+        asr = asr or self.asr
+        # one set of per-recording language pins for all workers of the run
+        language_pins = None
+        if asr.engine == ASREngine.ENGINE_LOCAL and asr.language is None and asr.pin_language:
+            language_pins = _LanguagePins(ASREngine.LANGUAGE_PIN_SAMPLES, ASREngine.LANGUAGE_PIN_CONFIDENCE)
+
+        if asr.engine != ASREngine.ENGINE_LOCAL:
+            worker_count = min(max(1, asr.cpu_workers), max(1, total_files))
+            workers = [asr.clone() for _ in range(worker_count)]
+            return workers, f"[DEBUG] Using {worker_count} API worker(s).", None
 
         cuda_indices = ASREngine.detect_cuda_device_indices()
         workers = []
 
-        if self.asr.device in {"auto", "cuda"} and cuda_indices:
+        if asr.device in {"auto", "cuda"} and cuda_indices:
             for gpu_index in cuda_indices:
-                for _ in range(self.asr.gpu_workers_per_device):
-                    worker = self.asr.clone()
+                for replica in range(asr.gpu_workers_per_device):
+                    worker = asr.clone()
                     worker.configure(
                         engine=worker.engine,
                         model_size=worker.model_size,
@@ -413,6 +957,8 @@ class MainProcess:
                         gpu_workers_per_device=worker.gpu_workers_per_device,
                         device_index=gpu_index,
                     )
+                    worker.use_model_replica(replica)
+                    worker.share_language_pins(language_pins)
                     workers.append(worker)
 
             if workers:
@@ -420,27 +966,308 @@ class MainProcess:
                 workers = workers[:max_workers]
                 return workers, (
                     f"[DEBUG] Using {len(workers)} local ASR worker(s) on CUDA device(s): {cuda_indices} "
-                    f"(workers/GPU={self.asr.gpu_workers_per_device})."
-                )
+                    f"(workers/GPU={asr.gpu_workers_per_device})."
+                ), language_pins
 
-        worker_count = min(max(1, self.asr.cpu_workers), max(1, total_files))
+        worker_count = min(max(1, asr.cpu_workers), max(1, total_files))
+        shared_model = _SharedModel(worker_count)
         for _ in range(worker_count):
-            worker = self.asr.clone()
+            worker = asr.clone()
             worker.configure(
                 engine=worker.engine,
                 model_size=worker.model_size,
                 language=worker.language or "auto",
-                device="cpu" if self.asr.device == "auto" else worker.device,
-                compute_type="int8" if self.asr.device == "auto" else worker.compute_type,
+                device="cpu" if asr.device == "auto" else worker.device,
+                compute_type="int8" if asr.device == "auto" else worker.compute_type,
                 cpu_workers=worker.cpu_workers,
                 gpu_workers_per_device=worker.gpu_workers_per_device,
                 device_index=0,
             )
+            if worker.device == "cpu":
+                worker.share_model(shared_model)
+            worker.share_language_pins(language_pins)
             workers.append(worker)
 
-        return workers, f"[DEBUG] Using {worker_count} local ASR worker(s) on CPU."
+        shared_note = " sharing one model" if workers[0].device == "cpu" else ""
+        return workers, f"[DEBUG] Using {worker_count} local ASR worker(s) on CPU{shared_note}.", language_pins
 
-    def process_wav_files(self, input_dir=None, separator='|'):
+    @staticmethod
+    def set_model_pool_budgets(ram_gb, vram_gb):
+        """Memory kept for loaded models between runs: `ram_gb` of host RAM, and `vram_gb` on each GPU."""
+        _MODEL_POOL.set_budgets(int(ram_gb * 2**30), int(vram_gb * 2**30))
+
+    def warm_up(self, asr_engine, model_size, language, device, compute_type, cpu_workers, gpu_workers_per_device,
+                model_pool_ram_gb=None, model_pool_vram_gb=None):
+        """Load the models a run with these ASR settings would use in a background thread; returns a status line."""
+        if model_pool_ram_gb is not None and model_pool_vram_gb is not None:
+            self.set_model_pool_budgets(model_pool_ram_gb, model_pool_vram_gb)
+        # a copy, so a run already in progress keeps the settings it started with
+        asr = self.asr.clone()
+        asr.configure(
+            engine=asr_engine,
+            model_size=model_size,
+            language=language,
+            device=device,
+            compute_type=compute_type,
+            cpu_workers=cpu_workers,
+            gpu_workers_per_device=gpu_workers_per_device,
+        )
+        if asr.engine != ASREngine.ENGINE_LOCAL:
+            return f"ASR engine {asr_engine} selected (no model to load)."
+
+        # same workers (and so the same pool keys) as a run over more files than workers
+        workers, _, _ = self._build_asr_workers(total_files=math.inf, asr=asr)
+
+        def load():
+            for worker in workers:
+                try:
+                    worker.warm_up()
+                except Exception:
+                    # the run reports load errors on its first file
+                    return
+
+        threading.Thread(target=load, name="asr-warm-up", daemon=True).start()
+        return (
+            f"Loading {len(workers)} worker model(s) for {model_size} on {device} ({compute_type}) in the background; "
+            f"they stay loaded between runs."
+        )
+
+    @staticmethod
+    def _model_pool_logs():
+        by_device = {}
+        for size, device, compute_type, nbytes in _MODEL_POOL.resident():
+            by_device.setdefault(device, []).append((size, compute_type, nbytes))
+        logs = []
+        for device, models in sorted(by_device.items()):
+            names = ", ".join(f"{size}/{compute_type}" for size, compute_type, _ in models)
+            used = sum(nbytes for _, _, nbytes in models)
+            logs.append(
+                f"[DEBUG] Models kept loaded on {device}: {names} "
+                f"({used / 2**20:.0f} of {_MODEL_POOL.budget(device) / 2**20:.0f} MB)"
+            )
+        return logs
+
+    def _ledger_params(self):
+        # device and worker counts do not change what a model transcribes
+        return {
+            "engine": self.asr.engine,
+            "model_size": self.asr.model_size,
+            "language": self.asr.language,
+            "compute_type": self.asr.compute_type,
+        }
+
+    def _reuse_transcripts(self, wav_files, params):
+        """Content hashes of all files plus {index: (transcript, language)} for those the ledger already covers."""
+        entries = self.ledger.lookup('transcribe', (wav_file.name for wav_file in wav_files))
+        hashes, reused = {}, {}
+        for idx, wav_file in enumerate(wav_files):
+            try:
+                hashes[wav_file.name] = self.ledger.content_hash(wav_file)
+            except OSError:
+                continue
+            entry = entries.get(wav_file.name)
+            if self.ledger.is_done(entry, hashes[wav_file.name], params):
+                reused[idx] = (entry[2]["transcript"], entry[2]["language"])
+        return hashes, reused
+
+    def _record_transcript(self, wav_file, content_hash, params, transcript, detected_lang):
+        if content_hash is None or transcript == "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**":
+            return None
+        try:
+            self.ledger.record('transcribe', wav_file.name, content_hash, params, {"transcript": transcript, "language": detected_lang})
+        except Exception as e:
+            return f"[WARNING] Could not update {self.ledger.path.name} for {wav_file.name}: {e}"
+        return None
+
+    def _cached_transcripts(self, wav_files, indices, params, cache_keys):
+        """({index: (transcript, language)} for files whose audio the transcript cache holds, files looked up).
+
+        Cache keys of the misses are left in `cache_keys`, so their transcripts can be stored once done.
+        """
+        keys = {}
+        for idx in indices:
+            try:
+                keys[idx] = self.transcript_cache.key(pcm_hash(wav_files[idx]), params)
+            except (OSError, ValueError):
+                continue
+        found = self.transcript_cache.get_many(keys.values())
+        cache_keys.update({idx: key for idx, key in keys.items() if key not in found})
+        return {idx: found[key] for idx, key in keys.items() if key in found}, len(keys)
+
+    @staticmethod
+    def _item_duration(item):
+        try:
+            return item.duration() if isinstance(item, VirtualChunk) else sf.info(str(item)).duration
+        except (RuntimeError, ValueError, OSError):
+            return 0.0
+
+    def _asr_groups(self, keys, durations):
+        """Split `keys` into worker jobs (single files, or groups transcribed together), longest job first."""
+        if self.asr.engine != ASREngine.ENGINE_LOCAL or not (self.asr.batch_size > 1 or self.asr.pack_windows):
+            groups = [[key] for key in keys]
+        elif not self.asr.pack_windows:
+            size = self.asr.batch_size
+            groups = [keys[first:first + size] for first in range(0, len(keys), size)]
+        else:
+            # packed jobs hold about `batch_size` full windows of audio
+            budget = self.asr.batch_size * ASREngine.PACK_WINDOW_SECONDS
+            groups, group, seconds = [], [], 0.0
+            for key in keys:
+                duration = durations[key] + ASREngine.PACK_GAP_SECONDS
+                if group and seconds + duration > budget:
+                    groups.append(group)
+                    group, seconds = [], 0.0
+                group.append(key)
+                seconds += duration
+            if group:
+                groups.append(group)
+
+        # long jobs first, so the run does not end waiting on one worker's late long file
+        groups.sort(key=lambda group: sum(durations[key] for key in group), reverse=True)
+        return groups
+
+    @staticmethod
+    def _pull_jobs(workers, jobs, run, stats, max_in_flight=None):
+        """Workers take jobs from one shared queue until `jobs` runs out.
+
+        At most `max_in_flight` jobs (default two per worker) are queued or running at once; the queue
+        is refilled from the `jobs` iterator as results come back, so job lists are consumed lazily.
+        Yields (job, worker index, result, error) as jobs finish; `stats` gets [jobs, busy seconds] per worker.
+        """
+        jobs = iter(jobs)
+        window = max_in_flight or 2 * len(workers)
+        pending = queue.Queue()
+        finished = queue.Queue()
+        stats.update({worker_idx: [0, 0.0] for worker_idx in range(len(workers))})
+
+        def pull(worker_idx):
+            while True:
+                job = pending.get()
+                if job is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    result, error = run(workers[worker_idx], job), None
+                except Exception as e:
+                    result, error = None, e
+                stats[worker_idx][0] += 1
+                stats[worker_idx][1] += time.perf_counter() - started
+                finished.put((job, worker_idx, result, error))
+
+        executor = ThreadPoolExecutor(max_workers=len(workers))
+        in_flight = 0
+        try:
+            for worker_idx in range(len(workers)):
+                executor.submit(pull, worker_idx)
+            for job in itertools.islice(jobs, window):
+                pending.put(job)
+                in_flight += 1
+
+            while in_flight:
+                item = finished.get()
+                in_flight -= 1
+                job = next(jobs, None)
+                if job is not None:
+                    pending.put(job)
+                    in_flight += 1
+                yield item
+        finally:
+            # a cancelled run drops queued jobs; every worker finishes its current one, then stops
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in workers:
+                pending.put(None)
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _utilization_logs(stats, wall_seconds):
+        logs = []
+        for worker_idx, (jobs, busy) in sorted(stats.items()):
+            share = busy / wall_seconds if wall_seconds > 0 else 0.0
+            logs.append(f"[DEBUG] worker-{worker_idx + 1}: {jobs} jobs, busy {busy:.1f}s of {wall_seconds:.1f}s ({share:.0%})")
+        return logs
+
+    def _plan_jobs(self, wav_files, results, hashes, cache_keys, durations, params, use_ledger, use_cache, notes, tally):
+        """Yield transcription jobs a wave of PLAN_WAVE files at a time, longest first within the wave.
+
+        Ledger and transcript cache hits go straight into `results`; ledger hashes, cache keys and durations
+        of the files still to transcribe are kept in `hashes`, `cache_keys` and `durations`, warnings in `notes`,
+        and the reuse counts and audio seconds in `tally`.
+        """
+        ledger_ok, cache_ok = use_ledger, use_cache
+        # files resumed from the journal are already in `results`
+        todo = [idx for idx, result in enumerate(results) if result is None]
+        for first in range(0, len(todo), self.PLAN_WAVE):
+            wave = todo[first:first + self.PLAN_WAVE]
+            if ledger_ok:
+                try:
+                    wave_hashes, reused = self._reuse_transcripts([wav_files[idx] for idx in wave], params)
+                except Exception as e:
+                    notes.append(f"[WARNING] Could not read {self.ledger.path.name}, transcribing every file: {e}")
+                    wave_hashes, reused, ledger_ok = {}, {}, False
+                for position, (transcript, detected_lang) in reused.items():
+                    idx = wave[position]
+                    results[idx] = (wav_files[idx], transcript, detected_lang)
+                    wave_hashes.pop(wav_files[idx].name, None)
+                hashes.update(wave_hashes)
+                tally["reused"] += len(reused)
+
+            pending = [idx for idx in wave if results[idx] is None]
+            if cache_ok and pending:
+                # same audio under another name (re-upload after a reset, another project)
+                try:
+                    cached, looked_up = self._cached_transcripts(wav_files, pending, params, cache_keys)
+                except Exception as e:
+                    notes.append(f"[WARNING] Could not read the transcript cache, transcribing without it: {e}")
+                    cached, looked_up, cache_ok = {}, 0, False
+                tally["cache_lookups"] += looked_up
+                tally["cache_hits"] += len(cached)
+                for idx, (transcript, detected_lang) in cached.items():
+                    results[idx] = (wav_files[idx], transcript, detected_lang)
+                    warning = self._record_transcript(wav_files[idx], hashes.pop(wav_files[idx].name, None), params, transcript, detected_lang)
+                    if warning:
+                        notes.append(warning)
+                pending = [idx for idx in pending if results[idx] is None]
+
+            # header-only reads; they order the wave and size packed groups
+            wave_durations = {idx: self._item_duration(wav_files[idx]) for idx in pending}
+            durations.update(wave_durations)
+            tally["seconds"] += sum(wave_durations.values())
+            yield from self._asr_groups(pending, wave_durations)
+
+    @staticmethod
+    def _prefetch_audio(items, decode):
+        """Decode the files flagged in `decode` for ASR ahead of time; the others, and any that fail, are passed on as is."""
+        prefetched = []
+        for item, wanted in zip(items, decode):
+            try:
+                prefetched.append(InMemoryAudio.load(item) if wanted else item)
+            except Exception:
+                # ASR reports the error when it reads the file itself
+                prefetched.append(item)
+        return prefetched
+
+    def _resume_from_journal(self, journal, wav_files, results, params):
+        """Fill `results` from an interrupted run's journal for files whose audio is unchanged; returns the count."""
+        entries = journal.load(params)
+        resumed = 0
+        for idx, wav_file in enumerate(wav_files):
+            entry = entries.get(wav_file.name)
+            if entry is None:
+                continue
+            try:
+                unchanged = entry[2] == audio_stamp(wav_file)
+            except OSError:
+                continue
+            if unchanged:
+                results[idx] = (wav_file, entry[0], entry[1])
+                resumed += 1
+        return resumed
+
+    def process_wav_files(self, input_dir=None, separator='|', use_ledger=True, resume=True, use_cache=True):
         directory = Path(input_dir) if input_dir else self.input_dir
         if not directory.exists():
             yield f"[ERROR] Input directory not found: {directory}"
@@ -454,39 +1281,151 @@ class MainProcess:
             yield "[WARNING] No .wav files found to transcribe."
             return
 
-        workers, worker_msg = self._build_asr_workers(total_files=len(wav_files))
-        yield worker_msg
-
         metadata = []
         languages_detected = set()
         failed_count = 0
         placeholder = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
 
         results = [None] * len(wav_files)
-        executors = [ThreadPoolExecutor(max_workers=1) for _ in workers]
+        params = self._ledger_params()
+        hashes = {}
+        cache_keys = {}
+        notes = []
+        tally = {"reused": 0, "cache_hits": 0, "cache_lookups": 0, "seconds": 0.0}
+
+        # every finished transcript is fsynced here first; metadata.csv is only written once the run completes
+        journal = MetadataJournal(self.metadata_file.with_name(self.metadata_file.name + JOURNAL_SUFFIX))
+        if resume:
+            try:
+                resumed = self._resume_from_journal(journal, wav_files, results, params)
+            except Exception as e:
+                yield f"[WARNING] Could not read {journal.path.name}, starting over: {e}"
+                resumed = 0
+            if resumed:
+                yield f"[DEBUG] Resuming an interrupted run: {resumed}/{len(wav_files)} files already transcribed in {journal.path.name}"
         try:
-            future_map = {}
-            for idx, wav_file in enumerate(wav_files):
-                worker_idx = idx % len(workers)
-                yield f"[DEBUG] Queueing: {wav_file.name} -> worker-{worker_idx + 1}"
-                future = executors[worker_idx].submit(workers[worker_idx].transcribe, wav_file)
-                future_map[future] = (idx, wav_file, worker_idx)
-
-            for future in as_completed(future_map):
-                idx, wav_file, worker_idx = future_map[future]
-                try:
-                    transcript, detected_lang, transcribe_logs = future.result()
-                except Exception as e:
-                    transcript = placeholder
-                    detected_lang = None
-                    transcribe_logs = [f"[ERROR] Worker-{worker_idx + 1} failed for {wav_file.name}: {e}"]
+            journal.open(params, resume)
+        except OSError as e:
+            yield f"[WARNING] Could not open {journal.path.name}, an interrupted run will start over: {e}"
+            journal = None
 
-                for log in transcribe_logs:
-                    yield f"[worker-{worker_idx + 1}] {log}"
-                results[idx] = (wav_file, transcript, detected_lang)
+        workers, worker_msg, language_pins = self._build_asr_workers(total_files=len(wav_files))
+        yield worker_msg
+        yield from self._model_pool_logs()
+        if self.asr.engine == ASREngine.ENGINE_LOCAL and self.asr.pack_windows:
+            yield f"[DEBUG] Packing short files into 30 s windows (batch size {self.asr.batch_size})"
+        elif self.asr.engine == ASREngine.ENGINE_LOCAL and self.asr.batch_size > 1:
+            yield f"[DEBUG] Batching speech across files (batch size {self.asr.batch_size})"
+        yield (
+            f"[DEBUG] Planning {self.PLAN_WAVE} files at a time, longest job first; "
+            f"at most {2 * len(workers)} jobs in flight, workers pull the next one when free"
+        )
+
+        # local ASR gets decoded arrays: each job's files are read and resampled when it enters the in-flight
+        # window, so decoding runs ahead of the workers (by up to one job per worker) instead of inside them
+        prefetch = None
+        if self.asr.engine == ASREngine.ENGINE_LOCAL:
+            prefetch = ThreadPoolExecutor(max_workers=self.PREFETCH_WORKERS, thread_name_prefix="asr-prefetch")
+            yield (
+                f"[DEBUG] Decoding upcoming files to 16 kHz on {self.PREFETCH_WORKERS} prefetch thread(s), "
+                f"up to {self.PREFETCH_MAX_SECONDS} s ahead; files over {self.PREFETCH_MAX_FILE_SECONDS} s are read by the workers"
+            )
+
+        durations = {}
+        # seconds of decoded audio held for jobs not yet finished; only touched on this generator's thread
+        prefetched_seconds = 0.0
+
+        def with_audio(jobs):
+            nonlocal prefetched_seconds
+            for group in jobs:
+                items = [wav_files[idx] for idx in group]
+                decode = [durations.get(idx, 0.0) <= self.PREFETCH_MAX_FILE_SECONDS for idx in group]
+                seconds = sum(durations.get(idx, 0.0) for idx, wanted in zip(group, decode) if wanted)
+                if prefetch is None or not any(decode) or prefetched_seconds + seconds > self.PREFETCH_MAX_SECONDS:
+                    # the worker decodes this job itself, like any job in a run without prefetch
+                    yield group, None, 0.0
+                    continue
+                prefetched_seconds += seconds
+                yield group, prefetch.submit(self._prefetch_audio, items, decode), seconds
+
+        def transcribe_group(worker, job):
+            group, audio, _ = job
+            return worker.transcribe_batch(audio.result() if audio else [wav_files[idx] for idx in group])
+
+        stats = {}
+        started = time.perf_counter()
+        try:
+            jobs = with_audio(self._plan_jobs(wav_files, results, hashes, cache_keys, durations, params, use_ledger, use_cache, notes, tally))
+            for (group, _, seconds), worker_idx, group_results, error in self._pull_jobs(workers, jobs, transcribe_group, stats):
+                prefetched_seconds -= seconds
+                for idx in group:
+                    durations.pop(idx, None)
+                yield from notes
+                notes.clear()
+                if error is not None:
+                    group_results = [
+                        (placeholder, None, [f"[ERROR] Worker-{worker_idx + 1} failed for {wav_files[idx].name}: {error}"])
+                        for idx in group
+                    ]
+
+                fresh, journaled = {}, []
+                for idx, (transcript, detected_lang, transcribe_logs) in zip(group, group_results):
+                    wav_file = wav_files[idx]
+                    for log in transcribe_logs:
+                        yield f"[worker-{worker_idx + 1}] {log}"
+                    results[idx] = (wav_file, transcript, detected_lang)
+                    if transcript == placeholder:
+                        # failures stay out of the journal, cache and ledger, so a resumed run retries them
+                        cache_keys.pop(idx, None)
+                        hashes.pop(wav_file.name, None)
+                        continue
+                    cache_key = cache_keys.pop(idx, None)
+                    if cache_key is not None:
+                        fresh[cache_key] = (transcript, detected_lang)
+                    if journal is not None:
+                        try:
+                            journaled.append((wav_file.name, transcript, detected_lang, audio_stamp(wav_file)))
+                        except OSError:
+                            pass
+                    if use_ledger:
+                        warning = self._record_transcript(wav_file, hashes.pop(wav_file.name, None), params, transcript, detected_lang)
+                        if warning:
+                            yield warning
+                if journaled:
+                    try:
+                        journal.append(journaled)
+                    except OSError as e:
+                        yield f"[WARNING] Could not write {journal.path.name}, an interrupted run will start over: {e}"
+                        journal.close()
+                        journal = None
+                if fresh:
+                    try:
+                        self.transcript_cache.put_many(fresh)
+                    except Exception as e:
+                        yield f"[WARNING] Could not update the transcript cache: {e}"
+            yield from notes
         finally:
-            for executor in executors:
-                executor.shutdown(wait=True)
+            if prefetch is not None:
+                prefetch.shutdown(wait=False, cancel_futures=True)
+            if journal is not None:
+                journal.close()
+
+        if tally["reused"]:
+            yield f"[DEBUG] Reused {tally['reused']} transcripts from {self.ledger.path.name} (unchanged audio, same ASR settings)"
+        if tally["cache_lookups"]:
+            hit_rate = tally["cache_hits"] / tally["cache_lookups"]
+            try:
+                cache_mb = f", {self.transcript_cache.usage() / 2**20:.1f} of {self.transcript_cache.max_bytes / 2**20:.0f} MB used"
+            except Exception:
+                cache_mb = ""
+            yield f"[DEBUG] Transcript cache: {tally['cache_hits']}/{tally['cache_lookups']} hits ({hit_rate:.0%}){cache_mb}"
+        yield f"[DEBUG] Transcribed {tally['seconds']:.0f}s of audio"
+        if language_pins is not None and language_pins.pinned:
+            yield (
+                f"[DEBUG] Language pinned for {len(language_pins.pinned)} source recording(s); "
+                f"detection skipped on {language_pins.skipped} files"
+            )
+        yield from self._utilization_logs(stats, time.perf_counter() - started)
 
         for result in results:
             wav_file, transcript, detected_lang = result
@@ -496,9 +1435,28 @@ class MainProcess:
                 failed_count += 1
             metadata.append([Path('wavs', wav_file.name).as_posix(), transcript])
 
+        yield from self._write_metadata(metadata, languages_detected, failed_count, separator)
+        # metadata.csv now holds everything the journal recorded
+        try:
+            MetadataJournal(self.metadata_file.with_name(self.metadata_file.name + JOURNAL_SUFFIX)).discard()
+        except OSError as e:
+            yield f"[WARNING] Could not remove the finished run's journal: {e}"
+
+    def _write_metadata(self, metadata, languages_detected, failed_count, separator):
         yield "[DEBUG] Writing metadata.csv..."
         df = pd.DataFrame(metadata, columns=["wav_filename", "transcript"])
-        df.to_csv(self.metadata_file, sep=separator, index=False, header=False)
+        # temp file + fsync + os.replace, so a crash while writing never leaves a truncated metadata.csv
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix='.csv', dir=self.metadata_file.parent)
+        try:
+            with os.fdopen(tmp_fd, 'w', encoding='utf-8', newline='') as f:
+                df.to_csv(f, sep=separator, index=False, header=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.metadata_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
         lang_summary = ", ".join(sorted(languages_detected)) if languages_detected else "N/A"
         yield f"[DEBUG] Languages detected: {lang_summary}"
@@ -514,6 +1472,405 @@ class MainProcess:
         else:
             yield f"[WARNING] {failed_count}/{total} files failed transcription (placeholders written).\n\n[OK] Finished processing {total} files ({succeeded} succeeded, {failed_count} failed)."
 
+    @staticmethod
+    def _plan_word_chunks(words, total_duration, min_chunk_duration, max_chunk_duration, pad_ms=WORD_PAD_MS):
+        """Group (start_s, end_s, word) timings into [start_ms, end_ms, text] chunks cut between words.
+
+        Each chunk ends at the widest pause that keeps it within the min/max window; a chunk only
+        exceeds the maximum when a single word is longer than it.
+        """
+        words = [
+            (int(start * 1000), math.ceil(end * 1000), text)
+            for start, end, text in words if text.strip()
+        ]
+        if not words:
+            return []
+
+        chunks = []
+        first = 0
+        chunk_start = max(0, words[0][0] - pad_ms)
+        while first < len(words):
+            tail_end = min(total_duration, words[-1][1] + pad_ms)
+            if tail_end - chunk_start <= max_chunk_duration or first == len(words) - 1:
+                chunks.append([chunk_start, tail_end, first, len(words)])
+                break
+
+            fitting = []
+            for j in range(first, len(words) - 1):
+                # cut in the middle of the pause, but never keep more than pad_ms of it
+                cut = min((words[j][1] + words[j + 1][0]) // 2, words[j][1] + pad_ms)
+                if cut - chunk_start > max_chunk_duration:
+                    break
+                fitting.append((words[j + 1][0] - words[j][1], j, cut))
+
+            long_enough = [c for c in fitting if c[2] - chunk_start >= min_chunk_duration]
+            if long_enough:
+                # widest pause wins; ties go to the later cut
+                _, last, cut = max(long_enough)
+            elif fitting:
+                _, last, cut = fitting[-1]
+            else:
+                last = first
+                cut = min((words[first][1] + words[first + 1][0]) // 2, words[first][1] + pad_ms)
+
+            chunks.append([chunk_start, cut, first, last + 1])
+            first = last + 1
+            chunk_start = max(cut, words[first][0] - pad_ms)
+
+        # fold a short tail into the previous chunk when the result still fits
+        if len(chunks) > 1:
+            tail, prev = chunks[-1], chunks[-2]
+            if tail[1] - tail[0] < min_chunk_duration and tail[1] - prev[0] <= max_chunk_duration:
+                chunks[-2:] = [[prev[0], tail[1], prev[2], tail[3]]]
+
+        return [
+            [start_ms, end_ms, "".join(text for _, _, text in words[a:b]).strip()]
+            for start_ms, end_ms, a, b in chunks
+        ]
+
+    def _long_form_job(self, worker, splitter, recording, min_chunk_duration, max_chunk_duration):
+        """Transcribe a whole recording once and cut it at word boundaries; returns (rows, language, logs, split)."""
+        placeholder = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
+        words, detected_lang, logs = worker.transcribe_words(recording)
+        if words is None:
+            return [(recording, placeholder)], detected_lang, logs, False
+
+        total_duration = int(sf.info(str(recording)).duration * 1000)
+        chunks = self._plan_word_chunks(words, total_duration, min_chunk_duration, max_chunk_duration)
+        if not chunks:
+            logs.append(f"[WARNING] No speech found in {recording.name}, keeping it unsplit")
+            return [(recording, placeholder)], detected_lang, logs, False
+
+        logs.append(f"[DEBUG] Splitting {recording.name} into {len(chunks)} chunks at word boundaries")
+        export_logs, exported = splitter.export_chunks(recording, [chunk[:2] for chunk in chunks])
+        logs.extend(export_logs)
+
+        texts = {f"{recording.stem}_processed{i + 1}.wav": text or placeholder for i, (_, _, text) in enumerate(chunks)}
+        rows = [(path, texts[path.name]) for path in exported]
+        for path, transcript in rows:
+            logs.append(f"[DEBUG] {path.name}: {transcript}")
+
+        if not rows:
+            return [(recording, placeholder)], detected_lang, logs, False
+        return rows, detected_lang, logs, True
+
+    def _short_form_job(self, worker, wav_file):
+        transcript, detected_lang, logs = worker.transcribe(wav_file)
+        return [(wav_file, transcript)], detected_lang, logs, False
+
+    def process_long_form(self, min_chunk_duration, max_chunk_duration, separator='|', use_ledger=True):
+        """Chunk and transcribe in one pass: long recordings are transcribed once with word timestamps
+        and cut between words, everything else is transcribed as-is."""
+        if min_chunk_duration <= 0 or min_chunk_duration > max_chunk_duration:
+            yield "[ERROR] Chunk durations must be greater than zero and minimum cannot exceed maximum."
+            return
+
+        if self.asr.engine != ASREngine.ENGINE_LOCAL:
+            yield f"[ERROR] Single-pass transcription needs word timestamps; select the {ASREngine.ENGINE_LOCAL} engine."
+            return
+
+        directory = self.input_dir
+        if not directory.exists():
+            yield f"[ERROR] Input directory not found: {directory}"
+            return
+
+        splitter = AudioSplitter(input_dir=directory, output_dir=directory)
+        recordings = set(splitter.source_recordings())
+        items = self._get_wav_files(directory)
+        durations = {item: self._item_duration(item) for item in items}
+        long_form = {item for item in items if item in recordings and durations[item] * 1000 > max_chunk_duration}
+        for item in items:
+            if item in recordings and not durations[item]:
+                yield f"[WARNING] Could not read the duration of {item.name}, transcribing it whole"
+
+        yield f"[DEBUG] Found {len(items)} .wav files ({len(long_form)} to chunk at word boundaries). Using '{separator}' as separator."
+        yield f"[DEBUG] ASR: {self.asr.engine} | Model: {self.asr.model_size} | Language: {self.asr.language or 'auto-detect'}"
+
+        if not items:
+            yield "[WARNING] No .wav files found to transcribe."
+            return
+
+        workers, worker_msg, _ = self._build_asr_workers(total_files=len(items))
+        yield worker_msg
+
+        placeholder = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
+        metadata = []
+        languages_detected = set()
+        split_recordings = []
+
+        def run_job(worker, item):
+            if item in long_form:
+                return self._long_form_job(worker, splitter, item, min_chunk_duration, max_chunk_duration)
+            return self._short_form_job(worker, item)
+
+        params = self._ledger_params()
+        stats = {}
+        started = time.perf_counter()
+        jobs = sorted(items, key=lambda item: durations[item], reverse=True)
+        for item, worker_idx, outcome, error in self._pull_jobs(workers, jobs, run_job, stats):
+            if error is not None:
+                outcome = ([(item, placeholder)], None, [f"[ERROR] Worker-{worker_idx + 1} failed for {item.name}: {error}"], False)
+            rows, detected_lang, job_logs, was_split = outcome
+
+            for log in job_logs:
+                yield f"[worker-{worker_idx + 1}] {log}"
+            if detected_lang:
+                languages_detected.add(detected_lang)
+            if was_split:
+                split_recordings.append(item)
+            metadata.extend(rows)
+            if use_ledger:
+                for row_item, transcript in rows:
+                    try:
+                        warning = self._record_transcript(row_item, self.ledger.content_hash(row_item), params, transcript, detected_lang)
+                    except OSError as e:
+                        warning = f"[WARNING] Could not hash {row_item.name} for {self.ledger.path.name}: {e}"
+                    if warning:
+                        yield warning
+        yield from self._utilization_logs(stats, time.perf_counter() - started)
+
+        # originals go only after every chunk of them has been written
+        for recording in split_recordings:
+            try:
+                recording.unlink()
+                yield f"[DEBUG] Removed original: {recording.name}"
+
+            except OSError as e:
+                yield f"[ERROR] Failed to remove {recording.name}: {e}"
+
+        metadata.sort(key=lambda row: self._sort_key(Path(row[0].name)))
+        failed_count = sum(1 for _, transcript in metadata if transcript == placeholder)
+        metadata = [[Path('wavs', item.name).as_posix(), transcript] for item, transcript in metadata]
+        yield from self._write_metadata(metadata, languages_detected, failed_count, separator)
+
+    @staticmethod
+    def _fuse_recording(splitter, noise_reducer, recording, min_chunk_duration, max_chunk_duration,
+                        denoise_settings, ready, split_recordings):
+        """Decode a recording once, then cut, denoise and write each chunk straight from memory.
+
+        Appends (dataset path, ASR input) to the `ready` deque as soon as an item is on disk and yields logs;
+        recordings that were cut into chunks are added to `split_recordings`.
+        """
+        try:
+            audio = AudioSegment.from_wav(recording)
+        except Exception as e:
+            yield f"[ERROR] Failed to read {recording.name}: {e}"
+            return
+
+        chunks, plan_logs = splitter.plan_segment(recording, audio, min_chunk_duration, max_chunk_duration)
+        for log in plan_logs:
+            yield log
+        if len(audio) == 0:
+            return
+
+        samples = silence.segment_samples(audio)
+        frame_rate = audio.frame_rate
+        if chunks:
+            targets = [
+                (splitter.output_dir / f"{recording.stem}_processed{i + 1}.wav", *silence.frame_index(bounds, frame_rate))
+                for i, bounds in enumerate(chunks)
+            ]
+        else:
+            targets = [(recording, 0, samples.shape[0])]
+
+        written = 0
+        for target, start_frame, end_frame in targets:
+            chunk = samples[start_frame:end_frame]
+            if chunk.shape[0] < end_frame - start_frame:
+                # chunk files are zero-padded past the end of the recording, keep that
+                chunk = np.pad(chunk, ((0, end_frame - start_frame - chunk.shape[0]), (0, 0)))
+            # same float64 mono signal sf.read + downmix gives the denoiser for a chunk file
+            mono = (chunk / float(audio.max_possible_amplitude)).mean(axis=1)
+            yield f"[DEBUG] Processing: {target.name} (sr={frame_rate}, in memory)"
+
+            try:
+                reduced, reduce_logs = noise_reducer.denoise_array(mono, frame_rate, *denoise_settings)
+            except Exception as e:
+                yield f"[ERROR] Noise reduction failed for {target.name}: {e}"
+                if target == recording:
+                    ready.append((recording, recording))
+                    continue
+                # never lose a chunk; keep it noisy rather than dropping its audio with the original
+                try:
+                    sf.write(str(target), mono, frame_rate)
+                except Exception as e:
+                    yield f"[ERROR] Failed to export {target.name}: {e}"
+                    continue
+                yield f"[WARNING] Wrote {target.name} without noise reduction"
+                reduced = mono
+            else:
+                for log in reduce_logs:
+                    yield log
+                save_failed = False
+                for log in noise_reducer.save_reduced(target, reduced, frame_rate):
+                    save_failed = save_failed or log.startswith("[ERROR]")
+                    yield log
+                if save_failed:
+                    if target == recording:
+                        ready.append((recording, recording))
+                    continue
+
+            written += 1
+            ready.append((target, InMemoryAudio.from_float(target.name, reduced, frame_rate)))
+
+        if chunks and written:
+            split_recordings.append(recording)
+
+    def _denoised_already(self, recordings, max_chunk_duration, denoise_params):
+        """Recordings short enough to stay whole whose current audio the ledger lists as denoised with these settings."""
+        short = []
+        for recording in recordings:
+            try:
+                if sf.info(str(recording)).duration * 1000 <= max_chunk_duration:
+                    short.append(recording)
+            except (RuntimeError, ValueError, OSError):
+                continue
+        entries = self.ledger.lookup('denoise', (recording.name for recording in short))
+        done = set()
+        for recording in short:
+            try:
+                if self.ledger.is_done(entries.get(recording.name), self.ledger.content_hash(recording), denoise_params):
+                    done.add(recording)
+            except OSError:
+                continue
+        return done
+
+    def process_fused(self, min_chunk_duration, max_chunk_duration, frame_length, hop_length, silence_threshold,
+                      noise_reduction_strength, use_spectral_gating, separator='|', use_ledger=True):
+        """Chunk, denoise and transcribe with a single decode per recording.
+
+        Chunks are cut and denoised in memory, written once, and handed to ASR as 16 kHz arrays
+        instead of being read back from disk. Items that are already chunks are transcribed as-is.
+        """
+        if min_chunk_duration <= 0 or min_chunk_duration > max_chunk_duration:
+            yield "[ERROR] Chunk durations must be greater than zero and minimum cannot exceed maximum."
+            return
+
+        directory = self.input_dir
+        if not directory.exists():
+            yield f"[ERROR] Input directory not found: {directory}"
+            return
+
+        splitter = AudioSplitter(input_dir=directory, output_dir=directory)
+        noise_reducer = NoiseReducer(input_dir=directory, ledger_path=self.ledger.path)
+        denoise_settings = (frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating)
+        # recordings are denoised one at a time here, never with a shared profile
+        denoise_params = NoiseReducer.ledger_params(*denoise_settings[:4], bool(use_spectral_gating), False)
+        params = self._ledger_params()
+
+        recordings = sorted(splitter.source_recordings(), key=self._sort_key)
+        if use_ledger:
+            try:
+                denoised = self._denoised_already(recordings, max_chunk_duration, denoise_params)
+            except Exception as e:
+                yield f"[WARNING] Could not read {self.ledger.path.name}, denoising every recording: {e}"
+                denoised = set()
+            if denoised:
+                yield f"[DEBUG] Skipping noise reduction for {len(denoised)} recordings already denoised with these settings ({self.ledger.path.name})"
+            recordings = [recording for recording in recordings if recording not in denoised]
+            noise_reducer.track_in_ledger(denoise_params)
+
+        queued = set(recordings)
+        existing = [item for item in self._get_wav_files(directory) if item not in queued]
+        yield (
+            f"[DEBUG] Found {len(recordings)} recordings to chunk and denoise in memory and {len(existing)} "
+            f"finished items to transcribe. Using '{separator}' as separator."
+        )
+        yield f"[DEBUG] ASR: {self.asr.engine} | Model: {self.asr.model_size} | Language: {self.asr.language or 'auto-detect'}"
+
+        if not recordings and not existing:
+            yield "[WARNING] No .wav files found to transcribe."
+            return
+
+        placeholder = "**NO TRANSCRIPT AVAILABLE, EDIT MANUALLY**"
+        results = []
+        hashes = {}
+        if use_ledger and existing:
+            try:
+                hashes, reused = self._reuse_transcripts(existing, params)
+            except Exception as e:
+                yield f"[WARNING] Could not read {self.ledger.path.name}, transcribing every file: {e}"
+                reused = {}
+            for idx, (transcript, detected_lang) in reused.items():
+                results.append((existing[idx], transcript, detected_lang))
+            if reused:
+                yield f"[DEBUG] Reusing {len(reused)} transcripts from {self.ledger.path.name} (unchanged audio, same ASR settings)"
+            existing = [item for idx, item in enumerate(existing) if idx not in reused]
+
+        # a recording turns into an unknown number of chunks, so every configured worker is started
+        workers, worker_msg, _ = self._build_asr_workers(total_files=math.inf) if recordings or existing else ([], None, None)
+        if worker_msg:
+            yield worker_msg
+
+        split_recordings = []
+        notes = []
+
+        def fused_jobs():
+            # finished items first, then each recording's chunks as soon as they are on disk; a worker pulls the
+            # next one only when it is free, so decoded chunks wait in memory only while every worker is busy
+            for item in existing:
+                yield item, item
+            ready = deque()
+            for recording in recordings:
+                for log in self._fuse_recording(
+                    splitter, noise_reducer, recording, min_chunk_duration, max_chunk_duration,
+                    denoise_settings, ready, split_recordings,
+                ):
+                    notes.append(log)
+                    while ready:
+                        yield ready.popleft()
+                while ready:
+                    yield ready.popleft()
+
+        def transcribe_item(worker, job):
+            _, audio_input = job
+            return worker.transcribe(audio_input)
+
+        stats = {}
+        started = time.perf_counter()
+        try:
+            for (item, _), worker_idx, outcome, error in self._pull_jobs(workers, fused_jobs(), transcribe_item, stats):
+                yield from notes
+                notes.clear()
+                if error is not None:
+                    transcript, detected_lang = placeholder, None
+                    transcribe_logs = [f"[ERROR] Worker-{worker_idx + 1} failed for {item.name}: {error}"]
+                else:
+                    transcript, detected_lang, transcribe_logs = outcome
+
+                for log in transcribe_logs:
+                    yield f"[worker-{worker_idx + 1}] {log}"
+                results.append((item, transcript, detected_lang))
+                if use_ledger:
+                    content_hash = hashes.get(item.name)
+                    if content_hash is None:
+                        try:
+                            content_hash = self.ledger.content_hash(item)
+                        except OSError as e:
+                            yield f"[WARNING] Could not hash {item.name} for {self.ledger.path.name}: {e}"
+                    warning = self._record_transcript(item, content_hash, params, transcript, detected_lang)
+                    if warning:
+                        yield warning
+            yield from notes
+        finally:
+            noise_reducer.track_in_ledger(None)
+        yield from self._utilization_logs(stats, time.perf_counter() - started)
+
+        # originals go only after every chunk of them has been written
+        for recording in split_recordings:
+            try:
+                recording.unlink()
+                yield f"[DEBUG] Removed original: {recording.name}"
+
+            except OSError as e:
+                yield f"[ERROR] Failed to remove {recording.name}: {e}"
+
+        results.sort(key=lambda row: self._sort_key(Path(row[0].name)))
+        languages_detected = {detected_lang for _, _, detected_lang in results if detected_lang}
+        failed_count = sum(1 for _, transcript, _ in results if transcript == placeholder)
+        metadata = [[Path('wavs', item.name).as_posix(), transcript] for item, transcript, _ in results]
+        yield from self._write_metadata(metadata, languages_detected, failed_count, separator)
+
     def zip_output(self, output_filename=None):
         output_path = Path(output_filename) if output_filename else self.output_dir / 'dataset.zip'
         if not self.metadata_file.is_file() or not self.input_dir.is_dir():
@@ -527,23 +1884,29 @@ class MainProcess:
         with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
             archive.write(self.metadata_file, arcname=self.metadata_file.name)
             for wav_file in wav_files:
-                archive.write(wav_file, arcname=Path('wavs', wav_file.name).as_posix())
+                arcname = Path('wavs', wav_file.name).as_posix()
+                if isinstance(wav_file, VirtualChunk):
+                    # virtual chunks are only materialized here, straight into the archive
+                    archive.writestr(arcname, wav_file.to_bytes())
+                else:
+                    archive.write(wav_file, arcname=arcname)
 
         return str(output_path)
 
     def total_audio_length(self, directory):
         total_length = 0
-        directory = Path(directory)
-        for wav_file in directory.iterdir():
-            if wav_file.suffix.lower() == '.wav':
-                try:
-                    with wave.open(str(wav_file), 'rb') as wf:
-                        total_length += wf.getnframes() / wf.getframerate()
-                except Exception:
+        for wav_file in list_dataset_audio(directory):
+            try:
+                if isinstance(wav_file, VirtualChunk):
+                    total_length += wav_file.duration()
                     continue
+                with wave.open(str(wav_file), 'rb') as wf:
+                    total_length += wf.getnframes() / wf.getframerate()
+            except Exception:
+                continue
         return total_length
 
-    def gradio_run(self, separator, asr_engine, model_size, language, device, compute_type, cpu_workers, gpu_workers_per_device):
+    def gradio_run(self, separator, asr_engine, model_size, language, device, compute_type, cpu_workers, gpu_workers_per_device, use_ledger=True, batch_size=1, pack_windows=False, resume=True, pin_language=True, use_cache=True):
         if not check_wav_files():
             yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
             return
@@ -556,9 +1919,65 @@ class MainProcess:
             compute_type=compute_type,
             cpu_workers=cpu_workers,
             gpu_workers_per_device=gpu_workers_per_device,
+            batch_size=batch_size,
+            pack_windows=pack_windows,
+            pin_language=pin_language,
         )
 
         logs = []
-        for log in self.process_wav_files(separator=separator):
+        for log in self.process_wav_files(separator=separator, use_ledger=use_ledger, resume=resume, use_cache=use_cache):
             logs.append(log)
-            yield "\n".join(logs)
\ No newline at end of file
+            yield "\n".join(logs)
+
+    def gradio_run_long_form(self, min_chunk_duration, max_chunk_duration, separator, asr_engine, model_size, language, device, compute_type, cpu_workers, gpu_workers_per_device, use_ledger=True):
+        if not check_wav_files():
+            yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
+            return
+
+        self.asr.configure(
+            engine=asr_engine,
+            model_size=model_size,
+            language=language,
+            device=device,
+            compute_type=compute_type,
+            cpu_workers=cpu_workers,
+            gpu_workers_per_device=gpu_workers_per_device,
+        )
+
+        logs = []
+        try:
+            for log in self.process_long_form(min_chunk_duration, max_chunk_duration, separator=separator, use_ledger=use_ledger):
+                logs.append(log)
+                yield "\n".join(logs)
+
+        except Exception as e:
+            yield f"[ERROR] An error occurred during processing: {str(e)}"
+
+    def gradio_run_fused(self, min_chunk_duration, max_chunk_duration, frame_length, hop_length, silence_threshold,
+                         noise_reduction_strength, use_spectral_gating, separator, asr_engine, model_size, language,
+                         device, compute_type, cpu_workers, gpu_workers_per_device, use_ledger=True):
+        if not check_wav_files():
+            yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
+            return
+
+        self.asr.configure(
+            engine=asr_engine,
+            model_size=model_size,
+            language=language,
+            device=device,
+            compute_type=compute_type,
+            cpu_workers=cpu_workers,
+            gpu_workers_per_device=gpu_workers_per_device,
+        )
+
+        logs = []
+        try:
+            for log in self.process_fused(
+                min_chunk_duration, max_chunk_duration, frame_length, hop_length, silence_threshold,
+                noise_reduction_strength, use_spectral_gating, separator=separator, use_ledger=use_ledger,
+            ):
+                logs.append(log)
+                yield "\n".join(logs)
+
+        except Exception as e:
+            yield f"[ERROR] An error occurred during processing: {str(e)}"
\ No newline at end of file
@@ -1,5 +1,7 @@
 import os
 
+from functions.helper.manifest import list_dataset_audio
+
 class SanityChecker:
     def __init__(self, metadata_file='metadata.csv', wav_directory='wavs'):
         self.metadata_file = metadata_file
@@ -14,7 +16,7 @@ class SanityChecker:
     def count_wav_files(self):
         if not os.path.isdir(self.wav_directory):
             return None
-        return len([f for f in os.listdir(self.wav_directory) if f.lower().endswith('.wav')])
+        return len(list_dataset_audio(self.wav_directory))
 
     def run_check(self):
         metadata_entries = self.count_entries_in_metadata()
@@ -1,32 +1,159 @@
 import re
 import math
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from pydub import AudioSegment
 from pydub.silence import detect_nonsilent
 
 from functions.helper.run_san import check_wav_files
+from functions.helper import silence, vad
+from functions.helper.wavio import WavMap, read_wav_info, write_wav_range
+from functions.helper.manifest import ChunkManifest, VirtualChunk
+from functions.helper.plan_cache import SplitPlanCache
 
 
 class AudioSplitter:
-    def __init__(self, input_dir='wavs/', output_dir='wavs/'):
+    SEGMENTER_NUMPY = "Energy (NumPy)"
+    SEGMENTER_PYDUB = "Energy (pydub)"
+    SEGMENTER_VAD = "Silero VAD"
+    AVAILABLE_SEGMENTERS = [SEGMENTER_NUMPY, SEGMENTER_PYDUB, SEGMENTER_VAD]
+
+    MIN_SILENCE_LEN = 300  # ms
+    SEEK_STEP = 10  # ms
+    SILENCE_OFFSET_DB = 16  # silence threshold below the file's average loudness
+    STREAM_WINDOW_MS = 60000  # audio scanned at once by the streaming splitter
+
+    VAD_THRESHOLD = 0.5  # speech probability above which a frame counts as speech
+    VAD_SPEECH_PAD_MS = 100  # padding kept around each speech region so onsets are not clipped
+
+    HISTOGRAM_BIN_MS = 1000
+
+    def __init__(self, input_dir='wavs/', output_dir='wavs/', segmenter=SEGMENTER_NUMPY, cache_dir='cache/split_plans'):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        self.segmenter = segmenter
+        self.plan_cache = SplitPlanCache(cache_dir)
         self.processed_pattern = re.compile(r'^(.*)_processed(\d+)\.wav$')
 
+    def _plan_key(self, filepath, streaming):
+        # only detection parameters go into the key; min/max durations are applied afterwards
+        return self.plan_cache.key(filepath, {
+            "segmenter": self.segmenter,
+            "min_silence_len": self.MIN_SILENCE_LEN,
+            "seek_step": self.SEEK_STEP,
+            "silence_offset_db": self.SILENCE_OFFSET_DB,
+            "stream_window_ms": self.STREAM_WINDOW_MS if streaming else 0,
+            "vad": [self.VAD_THRESHOLD, self.VAD_SPEECH_PAD_MS] if self.segmenter == self.SEGMENTER_VAD else None,
+        })
+
+    def _recorded(self, key, speech_regions):
+        """Pass streamed regions through while collecting them for the plan cache."""
+        collected = []
+        for region in speech_regions:
+            collected.append(region)
+            yield region
+        self.plan_cache.put(key, collected)
+
+    def _speech_regions(self, filepath, streaming=False):
+        """Speech regions and duration (ms) of a file, taken from the plan cache when possible."""
+        source_info = self._raw_pcm_info(filepath)
+        streaming = streaming and source_info is not None
+        key = self._plan_key(filepath, streaming)
+        speech_regions = self.plan_cache.get(key)
+
+        if source_info is None:
+            audio = AudioSegment.from_wav(filepath)
+            total_duration = len(audio)
+            if speech_regions is not None:
+                return speech_regions, total_duration, True
+            speech_regions = self._detect_speech_regions(audio)
+
+        else:
+            total_duration = self._duration_ms(source_info)
+            if speech_regions is not None:
+                return speech_regions, total_duration, True
+
+            if streaming:
+                with WavMap(filepath) as wav:
+                    speech_regions = list(self._stream_speech_regions(
+                        wav.samples, source_info.frame_rate, wav.max_possible_amplitude, self.STREAM_WINDOW_MS,
+                    ))
+            else:
+                speech_regions = self._detect_speech_regions(AudioSegment.from_wav(filepath))
+
+        self.plan_cache.put(key, speech_regions)
+        return speech_regions, total_duration, False
+
+    def _detect_vad(self, samples, frame_rate, max_amplitude):
+        return vad.detect_speech(
+            samples,
+            frame_rate,
+            max_amplitude,
+            min_silence_len=self.MIN_SILENCE_LEN,
+            speech_pad_ms=self.VAD_SPEECH_PAD_MS,
+            threshold=self.VAD_THRESHOLD,
+        )
+
+    def _detect_speech_regions(self, audio):
+        if self.segmenter == self.SEGMENTER_VAD:
+            # neural vad does not depend on the file's loudness, so it copes with noisy recordings
+            return self._detect_vad(silence.segment_samples(audio), audio.frame_rate, audio.max_possible_amplitude)
+
+        silence_thresh = audio.dBFS - self.SILENCE_OFFSET_DB
+
+        if self.segmenter == self.SEGMENTER_PYDUB:
+            return detect_nonsilent(
+                audio,
+                min_silence_len=self.MIN_SILENCE_LEN,
+                silence_thresh=silence_thresh,
+                seek_step=self.SEEK_STEP,
+            )
+
+        # framewise rms over one numpy view of the pcm data instead of one AudioSegment slice per step
+        return silence.detect_nonsilent(
+            silence.segment_samples(audio),
+            audio.frame_rate,
+            audio.max_possible_amplitude,
+            min_silence_len=self.MIN_SILENCE_LEN,
+            silence_thresh=silence_thresh,
+            seek_step=self.SEEK_STEP,
+        )
+
+    def plan_segment(self, filepath, audio, min_chunk_duration, max_chunk_duration):
+        """Chunk plan for a recording the caller already decoded into an AudioSegment.
+
+        Returns ([[start_ms, end_ms], ...], logs); the plan is empty when the file needs no split.
+        """
+        filepath = Path(filepath)
+        skip_log = self._skip_log(filepath, len(audio), max_chunk_duration)
+        if skip_log:
+            return [], [skip_log]
+
+        logs = []
+        key = self._plan_key(filepath, streaming=False)
+        speech_regions = self.plan_cache.get(key)
+        if speech_regions is not None:
+            logs.append(f"[DEBUG] Reusing cached speech regions for {filepath.name}")
+        else:
+            speech_regions = self._detect_speech_regions(audio)
+            self.plan_cache.put(key, speech_regions)
+
+        chunks = self._plan_chunks(speech_regions, len(audio), min_chunk_duration, max_chunk_duration)
+        logs.append(f"[DEBUG] Splitting {filepath.name} into {len(chunks)} chunks at silence boundaries")
+        return chunks, logs
+
     def _find_split_points(self, audio, min_chunk_duration, max_chunk_duration):
         # find speech regions
-        speech_regions = detect_nonsilent(
-            audio,
-            min_silence_len=300,
-            silence_thresh=audio.dBFS - 16,
-            seek_step=10,
-        )
+        speech_regions = self._detect_speech_regions(audio)
+        return self._plan_chunks(speech_regions, len(audio), min_chunk_duration, max_chunk_duration)
 
+    @staticmethod
+    def _plan_chunks(speech_regions, total_duration, min_chunk_duration, max_chunk_duration):
         if not speech_regions:
             # fall back to single chunk if no speech
-            return [(0, len(audio))]
+            return [(0, total_duration)]
 
-        total_duration = len(audio)
         chunks = []
         chunk_start = speech_regions[0][0]
 
@@ -53,50 +180,236 @@ class AudioSplitter:
             else:
                 merged.append((start, end))
 
-        # safety: even duration split if chunk too big
         final = []
         for start, end in merged:
-            duration = end - start
-            if duration > max_chunk_duration * 1.5:
-                n = math.ceil(duration / max_chunk_duration)
-                sub_len = math.ceil(duration / n)
-                pos = start
-                for _ in range(n):
-                    sub_end = min(pos + sub_len, end)
-                    final.append((pos, sub_end))
-                    pos = sub_end
+            final.extend(AudioSplitter._even_split(start, end, max_chunk_duration))
+
+        return final
+
+    @staticmethod
+    def _even_split(start, end, max_chunk_duration):
+        # safety: even duration split if chunk too big
+        duration = end - start
+        if duration <= max_chunk_duration * 1.5:
+            return [(start, end)]
+
+        n = math.ceil(duration / max_chunk_duration)
+        sub_len = math.ceil(duration / n)
+        parts = []
+        pos = start
+        for _ in range(n):
+            sub_end = min(pos + sub_len, end)
+            parts.append((pos, sub_end))
+            pos = sub_end
+        return parts
+
+    def _stream_speech_regions(self, samples, frame_rate, max_amplitude, window_ms):
+        """Yield speech regions window by window so only `window_ms` of audio is scanned at a time."""
+        total_duration = round(1000 * (samples.shape[0] / frame_rate))
+        cursor = 0
+
+        if self.segmenter == self.SEGMENTER_VAD:
+            def detect(window):
+                return self._detect_vad(window, frame_rate, max_amplitude)
+        else:
+            silence_thresh = silence.dbfs(samples, max_amplitude) - self.SILENCE_OFFSET_DB
+
+            def detect(window):
+                return silence.detect_nonsilent(
+                    window,
+                    frame_rate,
+                    max_amplitude,
+                    min_silence_len=self.MIN_SILENCE_LEN,
+                    silence_thresh=silence_thresh,
+                    seek_step=self.SEEK_STEP,
+                )
+
+        while cursor < total_duration:
+            window_end = min(total_duration, cursor + window_ms)
+            start_frame, end_frame = silence.frame_index([cursor, window_end], frame_rate)
+            regions = detect(samples[start_frame:end_frame])
+
+            if window_end >= total_duration:
+                for region_start, region_end in regions:
+                    yield (cursor + region_start, cursor + region_end)
+                return
+
+            if not regions:
+                # all silent; back off by one silence length so speech at the edge is not missed
+                cursor = max(cursor + self.MIN_SILENCE_LEN, window_end - self.MIN_SILENCE_LEN)
+                continue
 
+            last_start, last_end = regions[-1]
+            if last_end <= (window_end - cursor) - self.MIN_SILENCE_LEN:
+                # the window ends in detected silence, so every region is complete
+                next_cursor = cursor + last_end
+            elif last_start > 0:
+                # the last region may run past the window edge; rescan it with the next window
+                regions = regions[:-1]
+                next_cursor = cursor + last_start
             else:
-                final.append((start, end))
+                # speech spans the whole window; cut it here and let the even split handle it
+                next_cursor = window_end
+
+            for region_start, region_end in regions:
+                yield (cursor + region_start, cursor + region_end)
+            cursor = next_cursor
+
+    def _stream_chunks(self, speech_regions, total_duration, min_chunk_duration, max_chunk_duration):
+        """Incremental _plan_chunks: yields each chunk as soon as no later region can change it."""
+        held = None
+        chunk_start = None
+        last_end = None
+
+        def close_chunk(chunk):
+            nonlocal held
+            # a short chunk is merged into the previous one, so the previous one is only final once the next is known
+            if held is not None and (chunk[1] - chunk[0]) < min_chunk_duration:
+                held = (held[0], chunk[1])
+                return []
+            ready = self._even_split(held[0], held[1], max_chunk_duration) if held is not None else []
+            held = chunk
+            return ready
+
+        for region_start, region_end in speech_regions:
+            if chunk_start is None:
+                chunk_start = region_start
 
-        return final
+            if region_end - chunk_start > max_chunk_duration and region_start > chunk_start:
+                yield from close_chunk((chunk_start, region_start))
+                chunk_start = region_start
+            last_end = region_end
 
-    def split_audio(self, filepath, min_chunk_duration, max_chunk_duration):
-        logs = []
-        filepath = Path(filepath)
-        audio = AudioSegment.from_wav(filepath)
-        total_duration = len(audio)
+        if chunk_start is None:
+            # fall back to single chunk if no speech
+            yield (0, total_duration)
+            return
+
+        yield from close_chunk((chunk_start, last_end))
+        yield from self._even_split(held[0], held[1], max_chunk_duration)
+
+    @staticmethod
+    def _duration_ms(info):
+        return round(1000 * (info.n_frames / info.frame_rate)) if info.frame_rate else 0
+
+    @staticmethod
+    def _skip_log(filepath, total_duration, max_chunk_duration):
         if total_duration <= 0:
-            logs.append(f"[WARNING] Skipping empty file: {filepath.name}")
-            return logs, False
+            return f"[WARNING] Skipping empty file: {filepath.name}"
 
         # if file is already within acceptable range, skip splitting
         if total_duration <= max_chunk_duration:
-            logs.append(f"[DEBUG] {filepath.name} ({total_duration} ms) is within max duration, skipping split")
+            return f"[DEBUG] {filepath.name} ({total_duration} ms) is within max duration, skipping split"
+        return None
+
+    def split_audio_streaming(self, filepath, min_chunk_duration, max_chunk_duration):
+        """Split a WAV file through a memory map, writing each chunk as soon as its bounds are final."""
+        logs = []
+        filepath = Path(filepath)
+
+        with WavMap(filepath) as wav:
+            frame_rate = wav.info.frame_rate
+            total_duration = self._duration_ms(wav.info)
+            skip_log = self._skip_log(filepath, total_duration, max_chunk_duration)
+            if skip_log:
+                logs.append(skip_log)
+                return logs, False
+
+            logs.append(f"[DEBUG] Streaming split of {filepath.name} ({total_duration} ms) at silence boundaries")
+
+            key = self._plan_key(filepath, streaming=True)
+            speech_regions = self.plan_cache.get(key)
+            if speech_regions is not None:
+                logs.append(f"[DEBUG] Reusing cached speech regions for {filepath.name}")
+            else:
+                speech_regions = self._recorded(key, self._stream_speech_regions(
+                    wav.samples, frame_rate, wav.max_possible_amplitude, self.STREAM_WINDOW_MS,
+                ))
+            exported_chunks = 0
+            chunk_count = 0
+
+            for chunk_count, (start_ms, end_ms) in enumerate(
+                self._stream_chunks(speech_regions, total_duration, min_chunk_duration, max_chunk_duration), start=1,
+            ):
+                out_name = f"{filepath.stem}_processed{chunk_count}.wav"
+                output_path = self.output_dir / out_name
+                start_frame, end_frame = silence.frame_index([start_ms, end_ms], frame_rate)
+                try:
+                    write_wav_range(filepath, wav.info, output_path, start_frame, end_frame)
+                    exported_chunks += 1
+                    logs.append(f"[DEBUG] Exported chunk {chunk_count}: {out_name} ({end_ms - start_ms} ms)")
+
+                except Exception as e:
+                    logs.append(f"[ERROR] Failed to export chunk {chunk_count} ({out_name}): {e}")
+                    continue
+
+        logs.append(f"[DEBUG] Split {filepath.name} into {chunk_count} chunks")
+        return logs, exported_chunks > 0
+
+    @staticmethod
+    def _raw_pcm_info(filepath):
+        """Source layout when chunks can be byte-copied from the file instead of re-exported by pydub."""
+        try:
+            info = read_wav_info(filepath)
+        except (OSError, ValueError):
+            return None
+
+        # pydub converts 8-bit (unsigned) and 24-bit data on load, so only copy what it keeps verbatim
+        if info.sample_width not in (2, 4):
+            return None
+        return info
+
+    def split_audio(self, filepath, min_chunk_duration, max_chunk_duration, streaming=False):
+        if streaming:
+            try:
+                return self.split_audio_streaming(filepath, min_chunk_duration, max_chunk_duration)
+            except ValueError as e:
+                # not plain 16/32-bit pcm; fall through to the in-memory path
+                fallback_log = f"[WARNING] Streaming split unavailable for {Path(filepath).name} ({e}), loading into memory"
+                logs, was_split = self.split_audio(filepath, min_chunk_duration, max_chunk_duration)
+                return [fallback_log] + logs, was_split
+
+        logs = []
+        filepath = Path(filepath)
+        source_info = self._raw_pcm_info(filepath)
+        audio = None if source_info is not None else AudioSegment.from_wav(filepath)
+        total_duration = self._duration_ms(source_info) if source_info is not None else len(audio)
+        skip_log = self._skip_log(filepath, total_duration, max_chunk_duration)
+        if skip_log:
+            logs.append(skip_log)
             return logs, False
 
-        chunks = self._find_split_points(audio, min_chunk_duration, max_chunk_duration)
-        exported_chunks = 0
+        key = self._plan_key(filepath, streaming=False)
+        speech_regions = self.plan_cache.get(key)
+        if speech_regions is not None:
+            # byte-copyable pcm with cached regions never has to be decoded
+            logs.append(f"[DEBUG] Reusing cached speech regions for {filepath.name}")
+        else:
+            if audio is None:
+                audio = AudioSegment.from_wav(filepath)
+            speech_regions = self._detect_speech_regions(audio)
+            self.plan_cache.put(key, speech_regions)
+
+        chunks = self._plan_chunks(speech_regions, total_duration, min_chunk_duration, max_chunk_duration)
 
         logs.append(f"[DEBUG] Splitting {filepath.name} into {len(chunks)} chunks at silence boundaries")
+        exported = self._export_chunks(filepath, chunks, source_info, audio, logs)
+        return logs, len(exported) > 0
 
+    def _export_chunks(self, filepath, chunks, source_info, audio, logs):
+        exported = []
         for i, (start_ms, end_ms) in enumerate(chunks):
-            chunk_audio = audio[start_ms:end_ms]
             out_name = f"{filepath.stem}_processed{i+1}.wav"
             output_path = self.output_dir / out_name
             try:
-                chunk_audio.export(output_path, format="wav")
-                exported_chunks += 1
+                if source_info is not None:
+                    start_frame, end_frame = silence.frame_index([start_ms, end_ms], source_info.frame_rate)
+                    write_wav_range(filepath, source_info, output_path, start_frame, end_frame)
+                else:
+                    if audio is None:
+                        audio = AudioSegment.from_wav(filepath)
+                    audio[start_ms:end_ms].export(output_path, format="wav")
+                exported.append(output_path)
                 duration_ms = end_ms - start_ms
                 logs.append(f"[DEBUG] Exported chunk {i+1}: {out_name} ({duration_ms} ms)")
 
@@ -104,43 +417,162 @@ class AudioSplitter:
                 logs.append(f"[ERROR] Failed to export chunk {i+1} ({out_name}): {e}")
                 continue
 
-        return logs, exported_chunks > 0
+        return exported
 
-    def process_directory(self, min_chunk_duration, max_chunk_duration):
-        if min_chunk_duration <= 0 or max_chunk_duration <= 0:
-            yield "[ERROR] Chunk durations must be greater than zero."
-            return
+    def export_chunks(self, filepath, chunks):
+        """Write `[start_ms, end_ms]` chunks of a recording as `<name>_processedN.wav`; returns (logs, exported paths)."""
+        logs = []
+        filepath = Path(filepath)
+        exported = self._export_chunks(filepath, chunks, self._raw_pcm_info(filepath), None, logs)
+        return logs, exported
 
-        if min_chunk_duration > max_chunk_duration:
-            yield "[ERROR] Minimum chunk duration cannot be greater than maximum chunk duration."
-            return
+    def plan_virtual_chunks(self, filepath, min_chunk_duration, max_chunk_duration, streaming=False):
+        """Like split_audio, but returns VirtualChunk frame ranges instead of writing chunk files."""
+        logs = []
+        filepath = Path(filepath)
+        try:
+            info = read_wav_info(filepath)
+            if info.sample_width not in (2, 4):
+                raise ValueError(f"unsupported sample width: {info.sample_width} bytes")
+
+        except ValueError as e:
+            logs.append(f"[WARNING] Virtual chunks unavailable for {filepath.name} ({e}), writing chunk files")
+            split_logs, was_split = self.split_audio(filepath, min_chunk_duration, max_chunk_duration, streaming)
+            return logs + split_logs, was_split
+
+        total_duration = self._duration_ms(info)
+        skip_log = self._skip_log(filepath, total_duration, max_chunk_duration)
+        if skip_log:
+            logs.append(skip_log)
+            return logs, False
 
-        if not self.input_dir.is_dir():
-            yield f"[ERROR] Input directory not found: {self.input_dir}"
-            return
+        speech_regions, total_duration, cached = self._speech_regions(filepath, streaming)
+        if cached:
+            logs.append(f"[DEBUG] Reusing cached speech regions for {filepath.name}")
+        chunks = self._plan_chunks(speech_regions, total_duration, min_chunk_duration, max_chunk_duration)
 
-        files_to_process = sorted(
-            p for p in self.input_dir.iterdir()
-            if p.suffix.lower() == '.wav' and not self.processed_pattern.match(p.name)
-        )
+        logs.append(f"[DEBUG] Planning {len(chunks)} virtual chunks for {filepath.name} at silence boundaries")
 
-        file_count = len(files_to_process)
-        successfully_split = []
+        entries = []
+        for i, (start_ms, end_ms) in enumerate(chunks):
+            out_name = f"{filepath.stem}_processed{i+1}.wav"
+            start_frame, end_frame = silence.frame_index([start_ms, end_ms], info.frame_rate)
+            entries.append(VirtualChunk(out_name, filepath, int(start_frame), int(end_frame)))
+            logs.append(f"[DEBUG] Planned chunk {i+1}: {out_name} ({end_ms - start_ms} ms)")
+
+        return logs, entries
 
+    def _split_serial(self, split_fn, files_to_process, min_chunk_duration, max_chunk_duration, successfully_split, streaming):
         for filepath in files_to_process:
             yield f"[DEBUG] Splitting {filepath.name}"
             try:
-                split_logs, was_split = self.split_audio(filepath, min_chunk_duration, max_chunk_duration)
+                split_logs, was_split = split_fn(filepath, min_chunk_duration, max_chunk_duration, streaming)
                 for log in split_logs:
                     yield log
 
                 if was_split:
-                    successfully_split.append(filepath)
+                    successfully_split.append((filepath, was_split))
 
             except Exception as e:
                 yield f"[ERROR] Failed to split {filepath.name}: {e}"
 
-        for filepath in successfully_split:
+    def _split_parallel(self, split_fn, files_to_process, min_chunk_duration, max_chunk_duration, successfully_split, streaming, workers):
+        pending_files = iter(files_to_process)
+        in_flight = {}
+
+        # keep at most 2 files per worker queued so results stream back as soon as they finish
+        max_in_flight = workers * 2
+
+        def submit_next(executor):
+            filepath = next(pending_files, None)
+            if filepath is None:
+                return False
+            future = executor.submit(split_fn, filepath, min_chunk_duration, max_chunk_duration, streaming)
+            in_flight[future] = filepath
+            return True
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while len(in_flight) < max_in_flight and submit_next(executor):
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filepath = in_flight.pop(future)
+                    yield f"[DEBUG] Splitting {filepath.name}"
+                    try:
+                        split_logs, was_split = future.result()
+                        for log in split_logs:
+                            yield log
+
+                        if was_split:
+                            successfully_split.append((filepath, was_split))
+
+                    except Exception as e:
+                        yield f"[ERROR] Failed to split {filepath.name}: {e}"
+
+                    submit_next(executor)
+
+    def _validation_error(self, min_chunk_duration, max_chunk_duration):
+        if min_chunk_duration <= 0 or max_chunk_duration <= 0:
+            return "[ERROR] Chunk durations must be greater than zero."
+
+        if min_chunk_duration > max_chunk_duration:
+            return "[ERROR] Minimum chunk duration cannot be greater than maximum chunk duration."
+
+        if not self.input_dir.is_dir():
+            return f"[ERROR] Input directory not found: {self.input_dir}"
+        return None
+
+    def _files_to_split(self, manifest):
+        # recordings already split into virtual chunks stay on disk as their source
+        virtual_sources = manifest.sources()
+        return sorted(
+            p for p in self.input_dir.iterdir()
+            if p.suffix.lower() == '.wav' and not self.processed_pattern.match(p.name)
+            and p.name not in virtual_sources
+        )
+
+    def source_recordings(self):
+        """Recordings in the input directory that have not been chunked yet."""
+        return self._files_to_split(ChunkManifest(self.output_dir))
+
+    def process_directory(self, min_chunk_duration, max_chunk_duration, workers=1, streaming=False, virtual=False):
+        error = self._validation_error(min_chunk_duration, max_chunk_duration)
+        if error:
+            yield error
+            return
+
+        manifest = ChunkManifest(self.output_dir)
+        files_to_process = self._files_to_split(manifest)
+
+        file_count = len(files_to_process)
+        successfully_split = []
+        workers = min(max(1, int(workers)), max(1, file_count))
+        split_fn = self.plan_virtual_chunks if virtual else self.split_audio
+
+        if workers > 1:
+            yield f"[DEBUG] Splitting {file_count} files with {workers} worker processes"
+            split_logs = self._split_parallel(
+                split_fn, files_to_process, min_chunk_duration, max_chunk_duration, successfully_split, streaming, workers,
+            )
+        else:
+            split_logs = self._split_serial(
+                split_fn, files_to_process, min_chunk_duration, max_chunk_duration, successfully_split, streaming,
+            )
+
+        for log in split_logs:
+            yield log
+
+        virtual_chunks = [entry for _, result in successfully_split if isinstance(result, list) for entry in result]
+        if virtual_chunks:
+            manifest.add(virtual_chunks)
+            yield f"[DEBUG] Recorded {len(virtual_chunks)} virtual chunks in {manifest.path.name}"
+
+        # originals are only removed once every worker has finished, and never when chunks still point into them
+        for filepath, result in successfully_split:
+            if isinstance(result, list):
+                continue
             if filepath.is_file():
                 try:
                     filepath.unlink()
@@ -151,14 +583,107 @@ class AudioSplitter:
             
         yield f"\n[OK] Finished splitting {file_count} files."
 
-    def gradio_run(self, min_chunk_duration, max_chunk_duration):
+    def preview_directory(self, min_chunk_duration, max_chunk_duration, streaming=False):
+        """Dry run: report the resulting chunk count and duration histogram without writing anything."""
+        error = self._validation_error(min_chunk_duration, max_chunk_duration)
+        if error:
+            yield error
+            return
+
+        files_to_process = self._files_to_split(ChunkManifest(self.output_dir))
+        durations = []
+        cached_count = 0
+        detected_ms = 0
+        detection_seconds = 0.0
+
+        for filepath in files_to_process:
+            try:
+                source_info = self._raw_pcm_info(filepath)
+                total_duration = (
+                    self._duration_ms(source_info) if source_info is not None else len(AudioSegment.from_wav(filepath))
+                )
+                if total_duration <= 0:
+                    continue
+
+                if total_duration <= max_chunk_duration:
+                    durations.append(total_duration)
+                    yield f"[DEBUG] {filepath.name}: kept as 1 chunk ({total_duration} ms)"
+                    continue
+
+                started = time.perf_counter()
+                speech_regions, total_duration, cached = self._speech_regions(filepath, streaming)
+                cached_count += cached
+                if not cached:
+                    detection_seconds += time.perf_counter() - started
+                    detected_ms += total_duration
+                chunks = self._plan_chunks(speech_regions, total_duration, min_chunk_duration, max_chunk_duration)
+                durations.extend(end - start for start, end in chunks)
+                yield f"[DEBUG] {filepath.name}: {len(chunks)} chunks ({'cached' if cached else 'detected'} regions)"
+
+            except Exception as e:
+                yield f"[ERROR] Failed to preview {filepath.name}: {e}"
+
+        if not durations:
+            yield "\n[WARNING] No chunks would be produced."
+            return
+
+        yield (
+            f"\n[OK] Preview: {len(durations)} chunks from {len(files_to_process)} files "
+            f"({cached_count} from cached regions). "
+            f"Min {min(durations)} ms | Mean {round(sum(durations) / len(durations))} ms | Max {max(durations)} ms"
+        )
+        if detected_ms and detection_seconds > 0:
+            # compare segmenters on the same files: throughput here, duration spread in the histogram below
+            yield (
+                f"[DEBUG] {self.segmenter}: detected {detected_ms / 1000:.0f} s of audio in {detection_seconds:.2f} s "
+                f"({detected_ms / 1000 / detection_seconds:.0f}x realtime)"
+            )
+        mean = sum(durations) / len(durations)
+        spread = math.sqrt(sum((d - mean) ** 2 for d in durations) / len(durations))
+        yield f"[DEBUG] Duration spread (std dev): {round(spread)} ms"
+        for log in self._duration_histogram(durations):
+            yield log
+
+    def _duration_histogram(self, durations):
+        bin_ms = self.HISTOGRAM_BIN_MS
+        counts = {}
+        for duration in durations:
+            counts[duration // bin_ms] = counts.get(duration // bin_ms, 0) + 1
+
+        peak = max(counts.values())
+        for b in range(min(counts), max(counts) + 1):
+            count = counts.get(b, 0)
+            bar = "#" * math.ceil(40 * count / peak) if count else ""
+            yield f"{b * bin_ms:>6}-{(b + 1) * bin_ms:<6} ms | {count:>5} {bar}"
+
+    def gradio_preview(self, min_chunk_duration, max_chunk_duration, streaming=False, segmenter=None):
+        if segmenter:
+            self.segmenter = segmenter
+
+        if not check_wav_files():
+            yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
+            return
+
+        logs = []
+        try:
+            for log in self.preview_directory(min_chunk_duration, max_chunk_duration, streaming):
+                logs.append(log)
+                yield "\n".join(logs)
+
+        except Exception as e:
+            yield f"[ERROR] An error occurred during preview: {str(e)}"
+
+    def gradio_run(self, min_chunk_duration, max_chunk_duration, workers=1, streaming=False, virtual=False, segmenter=None):
+        if segmenter:
+            self.segmenter = segmenter
+
         if not check_wav_files():
             yield "ERROR: No .wav files found in the input directory. Please upload them and try again."
             return
 
         logs = []
         try:
-            for log in self.process_directory(min_chunk_duration, max_chunk_duration):
+            for log in self.process_directory(min_chunk_duration, max_chunk_duration, workers, streaming, virtual):
                 logs.append(log)
                 yield "\n".join(logs)
 
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from functions.filter import NoiseReducer
+
+
+def _loop_noise_profile(audio, sample_rate, frame_length, hop_length, silence_threshold):
+    """The per-hop loop _estimate_noise_profile replaced, kept as the reference."""
+    rms_values = []
+    indices = list(range(0, len(audio), hop_length))
+
+    for i in indices:
+        frame = audio[i:i + frame_length]
+        if len(frame) > 0:
+            rms_values.append(np.sqrt(np.mean(frame ** 2)))
+        else:
+            rms_values.append(0.0)
+
+    rms_values = np.array(rms_values)
+    max_rms = np.max(rms_values) if rms_values.size > 0 else 0
+
+    if max_rms <= 0:
+        return audio[:max(frame_length, len(audio) // 10)]
+
+    normalized_rms = rms_values / max_rms
+    noise_frames = []
+    for idx, i in enumerate(indices):
+        if idx < len(normalized_rms) and normalized_rms[idx] < silence_threshold:
+            noise_frames.append(audio[i:i + frame_length])
+
+    if noise_frames:
+        return np.concatenate(noise_frames)
+    return audio[:max(frame_length, len(audio) // 10)]
+
+
+def _speech_like(n_samples, dtype, seed):
+    """Noise with loud and quiet stretches, so thresholds pick out some frames and not others."""
+    rng = np.random.default_rng(seed)
+    gain = np.repeat(rng.choice([0.002, 0.02, 0.5], size=n_samples // 1000 + 1), 1000)[:n_samples]
+    return (rng.standard_normal(n_samples) * gain).astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("n_samples", [100, 2048, 2049, 22050, 50000])
+@pytest.mark.parametrize("frame_length, hop_length", [(2048, 512), (1024, 256), (512, 512), (400, 160)])
+@pytest.mark.parametrize("silence_threshold", [0.05, 0.1, 0.3])
+def test_noise_profile_matches_loop(dtype, n_samples, frame_length, hop_length, silence_threshold):
+    audio = _speech_like(n_samples, dtype, seed=n_samples + frame_length)
+    args = (audio, 22050, frame_length, hop_length, silence_threshold)
+
+    expected = _loop_noise_profile(*args)
+    actual = NoiseReducer._estimate_noise_profile(*args)
+    assert actual.dtype == expected.dtype
+    assert np.array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("n_samples", [100, 5000, 40000])
+def test_silent_input_falls_back_to_first_tenth(n_samples):
+    audio = np.zeros(n_samples, dtype=np.float32)
+    args = (audio, 22050, 2048, 512, 0.1)
+
+    expected = _loop_noise_profile(*args)
+    actual = NoiseReducer._estimate_noise_profile(*args)
+    assert np.array_equal(actual, expected)
+    assert len(actual) == min(n_samples, max(2048, n_samples // 10))
+
+
+def test_no_quiet_frames_falls_back_to_first_tenth():
+    # a steady tone has no frame below any threshold under 1
+    audio = np.sin(np.arange(40000) * 0.05).astype(np.float32)
+    args = (audio, 22050, 2048, 512, 0.1)
+
+    expected = _loop_noise_profile(*args)
+    actual = NoiseReducer._estimate_noise_profile(*args)
+    assert np.array_equal(actual, expected)
+    assert np.array_equal(actual, audio[:4000])
+
+
+def test_faster_than_loop_on_an_hour():
+    audio = _speech_like(22050 * 3600, np.float32, seed=1)
+    args = (audio, 22050, 2048, 512, 0.1)
+
+    started = time.perf_counter()
+    expected = _loop_noise_profile(*args)
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = NoiseReducer._estimate_noise_profile(*args)
+    numpy_seconds = time.perf_counter() - started
+
+    assert np.array_equal(actual, expected)
+    # the loop measures every hop in Python; a conservative margin keeps this stable on slow machines
+    assert numpy_seconds * 2 < loop_seconds
+
+
+def test_gated_batches_restore_torch_threads(tmp_path):
+    torch = pytest.importorskip("torch")
+    for i in range(4):
+        sf.write(tmp_path / f"clip_processed{i}.wav", _speech_like(8000 + 1000 * i, np.float32, seed=i), 16000)
+
+    before = torch.get_num_threads()
+    threads = 3 if before == 2 else 2
+    reducer = NoiseReducer(input_dir=tmp_path, ledger_path=tmp_path / "ledger.db")
+    logs = list(reducer.process_audio_files(2048, 512, 0.1, 0.6, True, workers=threads, gate_batch_size=2))
+
+    assert f"{threads} torch threads" in "\n".join(logs)
+    assert torch.get_num_threads() == before
+
+
+def test_shared_profile_is_part_of_the_ledger_key(tmp_path):
+    for i in range(3):
+        sf.write(tmp_path / f"rec_processed{i}.wav", _speech_like(16000, np.float32, seed=10 + i), 16000)
+    reducer = NoiseReducer(input_dir=tmp_path, ledger_path=tmp_path / "ledger.db")
+
+    def run(shared_profile):
+        return "\n".join(reducer.process_audio_files(2048, 512, 0.1, 0.6, False, shared_profile=shared_profile))
+
+    assert "Skipping" not in run(False)
+    shared = run(True)
+    assert "Skipping" not in shared
+    assert "Shared noise profile for rec" in shared
+    assert "Skipping 3 files" in run(True)
+    assert "Skipping" not in run(False)
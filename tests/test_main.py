@@ -0,0 +1,241 @@
+import os
+import re
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from functions.helper.memaudio import ASR_SAMPLE_RATE, InMemoryAudio
+from functions.helper.transcript_cache import TranscriptCache
+from functions.main import ASREngine, MainProcess
+
+
+def _speech_like(seconds, sample_rate, seed):
+    """Bursts of noise separated by 0.8 s pauses, so silence-based splitting finds cut points."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    while sum(map(len, parts)) < seconds * sample_rate:
+        parts += [rng.standard_normal(int(2.5 * sample_rate)) * 0.3, np.zeros(int(0.8 * sample_rate))]
+    return np.concatenate(parts)[:int(seconds * sample_rate)].astype(np.float32)
+
+
+class _StubWorker:
+    def __init__(self, delay):
+        self.delay = delay
+        self.seen = 0
+
+    def transcribe(self, audio_file):
+        time.sleep(self.delay)
+        return f"text of {audio_file.name}", "en", []
+
+    def transcribe_batch(self, audio_files):
+        self.seen += len(audio_files)
+        return [self.transcribe(audio_file) for audio_file in audio_files]
+
+
+def test_fused_run_pulls_jobs_dynamically(tmp_path, monkeypatch):
+    wavs = tmp_path / "wavs"
+    wavs.mkdir()
+    sf.write(wavs / "rec.wav", _speech_like(20, 16000, seed=0), 16000, subtype='PCM_16')
+    for i in range(8):
+        sf.write(wavs / f"old_processed{i + 1}.wav", _speech_like(2, 16000, seed=i + 1), 16000, subtype='PCM_16')
+
+    # worker-1 is slow; with a shared queue worker-2 takes over the rest instead of waiting on a fixed share
+    workers = [_StubWorker(0.5), _StubWorker(0.0)]
+    process = MainProcess(input_dir=wavs, metadata_file=tmp_path / "metadata.csv")
+    monkeypatch.setattr(process, "_build_asr_workers", lambda total_files: (workers, "[DEBUG] stub workers", None))
+    logs = list(process.process_fused(4000, 10000, 2048, 512, 0.1, 0.6, False, use_ledger=False))
+
+    jobs = {int(worker): int(count) for worker, count in re.findall(r"worker-(\d): (\d+) jobs", "\n".join(logs))}
+    rows = (tmp_path / "metadata.csv").read_text().splitlines()
+    assert len(rows) == sum(jobs.values()) > 8
+    assert not (wavs / "rec.wav").exists()
+    assert jobs[2] > jobs[1]
+    for row in rows:
+        name, transcript = row.split("|")[:2]
+        assert transcript == f"text of {name.split('/')[-1]}"
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_transcript_cache_works_without_the_ledger(tmp_path, monkeypatch, use_cache):
+    wavs = tmp_path / "wavs"
+    wavs.mkdir()
+    for i in range(3):
+        sf.write(wavs / f"rec_processed{i + 1}.wav", _speech_like(1, 16000, seed=i), 16000, subtype='PCM_16')
+
+    worker = _StubWorker(0.0)
+    process = MainProcess(input_dir=wavs, metadata_file=tmp_path / "metadata.csv")
+    process.transcript_cache = TranscriptCache(tmp_path / "transcripts.db")
+    monkeypatch.setattr(process, "_build_asr_workers", lambda total_files: ([worker], "[DEBUG] stub worker", None))
+
+    def run():
+        return "\n".join(process.process_wav_files(use_ledger=False, resume=False, use_cache=use_cache))
+
+    run()
+    # the same audio under new names: only the cache can know it
+    for i in range(3):
+        (wavs / f"rec_processed{i + 1}.wav").rename(wavs / f"again_processed{i + 1}.wav")
+    logs = run()
+    if use_cache:
+        assert "Transcript cache: 3/3 hits" in logs and worker.seen == 3
+    else:
+        assert "Transcript cache" not in logs and worker.seen == 6
+
+
+class _StubPipeline:
+    """BatchedInferencePipeline.transcribe as faster-whisper 1.2 runs it with clip_timestamps.
+
+    Each clip is audio[int(start * 16000):int(end * 16000)]; its segments carry seek = offset * frames_per_second
+    and times relative to the whole buffer. Instead of decoding, every run of one non-zero level becomes a word
+    named after the run's level, so the text says exactly which audio it came from.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, batch_size, language, clip_timestamps, word_timestamps=False):
+        self.calls.append((batch_size, language, len(clip_timestamps)))
+        return self._segments(audio, clip_timestamps, word_timestamps), None
+
+    @staticmethod
+    def _segments(audio, clip_timestamps, word_timestamps):
+        for clip in clip_timestamps:
+            start, end = int(clip["start"] * ASR_SAMPLE_RATE), int(clip["end"] * ASR_SAMPLE_RATE)
+            samples = audio[start:end]
+            offset = start / ASR_SAMPLE_RATE
+            edges = [0, *(np.flatnonzero(np.diff(samples)) + 1), len(samples)]
+            words = [
+                SimpleNamespace(
+                    start=offset + first / ASR_SAMPLE_RATE, end=offset + last / ASR_SAMPLE_RATE,
+                    word=f" c{round(float(samples[first]) * 1000)}",
+                )
+                for first, last in zip(edges, edges[1:]) if samples[first] != 0
+            ]
+            yield SimpleNamespace(
+                seek=int(offset * 50), start=offset, end=offset + len(samples) / ASR_SAMPLE_RATE,
+                text="".join(word.word for word in words), words=words if word_timestamps else None,
+            )
+
+
+def _stub_engine(monkeypatch, batch_size, pack_windows):
+    engine = ASREngine()
+    engine.configure(
+        ASREngine.ENGINE_LOCAL, model_size="tiny", language="en", device="cpu", compute_type="int8",
+        batch_size=batch_size, pack_windows=pack_windows,
+    )
+    engine._model = SimpleNamespace(frames_per_second=50)
+    engine._batched_pipeline = _StubPipeline()
+    engine._device_status = ""
+    # stands in for the VAD: every file's speech is its two halves
+    monkeypatch.setattr(engine, "_speech_chunks", lambda audio: [audio[:len(audio) // 2], audio[len(audio) // 2:]])
+    return engine
+
+
+def _two_level_clip(idx, seconds):
+    """Audio whose halves sit at levels c(10 + 2 idx) and c(11 + 2 idx)."""
+    n_samples = int(seconds * ASR_SAMPLE_RATE)
+    audio = np.full(n_samples, (10 + 2 * idx) / 1000, dtype=np.float32)
+    audio[n_samples // 2:] = (11 + 2 * idx) / 1000
+    return InMemoryAudio(f"clip_processed{idx + 1}.wav", audio)
+
+
+def test_transcribe_clips_maps_segments_back_to_their_clip(monkeypatch):
+    engine = _stub_engine(monkeypatch, batch_size=4, pack_windows=False)
+    lengths = [16000, 7001, 24000, 1, 39999]
+    clips = [np.full(n_samples, (idx + 1) / 1000, dtype=np.float32) for idx, n_samples in enumerate(lengths)]
+
+    results = engine._transcribe_clips(clips, "en", word_timestamps=True)
+    for idx, (n_samples, segments) in enumerate(zip(lengths, results)):
+        # times are relative to the clip, and the clip is exactly its own samples
+        (start, end, text, words), = segments
+        assert (start, text) == (0.0, f" c{idx + 1}")
+        assert end == pytest.approx(n_samples / ASR_SAMPLE_RATE)
+        assert words == [(0.0, pytest.approx(n_samples / ASR_SAMPLE_RATE), f" c{idx + 1}")]
+
+
+def test_batched_transcripts_go_to_their_files(monkeypatch):
+    engine = _stub_engine(monkeypatch, batch_size=3, pack_windows=False)
+    files = [_two_level_clip(idx, seconds) for idx, seconds in enumerate([4.3, 1.05, 7.9, 2.0, 5.55])]
+
+    results = engine.transcribe_batch(files)
+    assert [transcript for transcript, _, _ in results] == [f"c{10 + 2 * idx} c{11 + 2 * idx}" for idx in range(len(files))]
+    assert [language for _, language, _ in results] == ["en"] * len(files)
+    # all ten halves in one call, decoded three at a time
+    assert engine._batched_pipeline.calls == [(3, "en", 10)]
+
+
+def test_packed_windows_split_back_to_their_files(monkeypatch):
+    engine = _stub_engine(monkeypatch, batch_size=2, pack_windows=True)
+    files = [_two_level_clip(idx, seconds) for idx, seconds in enumerate([3.1, 5.0, 2.2, 8.75, 4.0, 6.4, 3.3, 40.0, 1.5])]
+
+    results = engine.transcribe_batch(files)
+    assert [transcript for transcript, _, _ in results] == [f"c{10 + 2 * idx} c{11 + 2 * idx}" for idx in range(len(files))]
+    # the 40 s file is cut into its halves first; everything else packs into a few windows
+    _, _, windows = engine._batched_pipeline.calls[0]
+    assert len(engine._batched_pipeline.calls) == 1 and windows < len(files)
+
+
+def test_split_window_text():
+    members = [("a", 0.0, 2.0), ("b", 3.0, 6.5), ("c", 7.5, 9.0)]
+    segments = [
+        (0.0, 6.0, " one two three", [(0.1, 1.0, " one"), (1.2, 2.9, " two"), (3.2, 5.0, " three")]),
+        # no word timings: the whole segment goes where its midpoint falls
+        (6.2, 6.6, " four", None),
+        (7.0, 9.0, " five", [(6.8, 7.3, " five")]),
+    ]
+    assert ASREngine._split_window_text(segments, members) == ["one two", "three four", "five"]
+    assert ASREngine._split_window_text(segments, members[:1]) == ["one two three  four  five"]
+    assert ASREngine._split_window_text([], members) == ["", "", ""]
+
+
+def _voiced(seconds, seed):
+    """A buzzy harmonic tone switched on and off four times a second, which the VAD takes for speech."""
+    t = np.arange(int(seconds * ASR_SAMPLE_RATE)) / ASR_SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(120 + 20 * np.sin(np.pi * t + seed)) / ASR_SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 20)) * (np.sin(8 * np.pi * t) > -0.3)
+    noise = np.random.default_rng(seed).standard_normal(len(t)) * 0.003
+    return (voice * 0.1 + noise).astype(np.float32)
+
+
+def _cached_model():
+    """Path of a converted faster-whisper model on disk, or None; ASR_BENCHMARK_MODEL overrides "tiny"."""
+    model = os.environ.get("ASR_BENCHMARK_MODEL", "tiny")
+    if os.path.isdir(model):
+        return model
+    try:
+        from faster_whisper.utils import download_model
+
+        return download_model(model, local_files_only=True)
+    except Exception:
+        return None
+
+
+def test_batched_throughput_against_per_file(monkeypatch):
+    model = _cached_model()
+    if model is None:
+        pytest.skip("no faster-whisper model cached locally")
+    from faster_whisper import BatchedInferencePipeline
+
+    # fixed decode length, so both paths do the same decoder work whatever the weights make of the audio
+    transcribe = BatchedInferencePipeline.transcribe
+    monkeypatch.setattr(BatchedInferencePipeline, "transcribe", lambda self, *args, **kwargs: transcribe(self, *args, max_new_tokens=25, **kwargs))
+
+    rng = np.random.default_rng(0)
+    files = [InMemoryAudio(f"clip_processed{idx + 1}.wav", _voiced(seconds, idx)) for idx, seconds in enumerate(rng.uniform(3, 8, size=16))]
+    timings, transcripts = {}, {}
+    for batch_size in (1, 8):
+        engine = ASREngine()
+        engine.configure(ASREngine.ENGINE_LOCAL, model_size=model, language="en", device="cpu", compute_type="int8",
+                         batch_size=batch_size)
+        engine.warm_up()
+        started = time.perf_counter()
+        results = engine.transcribe_batch(files)
+        timings[batch_size] = time.perf_counter() - started
+        transcripts[batch_size] = [transcript for transcript, _, _ in results]
+
+    assert transcripts[8] == transcripts[1]
+    print(f"per-file {len(files) / timings[1]:.2f} files/s, batch 8 {len(files) / timings[8]:.2f} files/s")
+    # batching pays off with spare cores or a GPU; on one core it only has to stay close
+    assert timings[8] < timings[1] * 1.5
@@ -11,6 +11,7 @@ from functions.main import MainProcess, ASREngine
 from functions.sanitycheck import SanityChecker
 
 from functions.helper.janitor import Janitor
+from functions.helper.manifest import VirtualChunk, list_dataset_audio
 
 class LJSpeechDatasetUI:
     def __init__(self, dataset_dir, metadata_file):
@@ -19,6 +20,10 @@ class LJSpeechDatasetUI:
         self.separator = '|'
         self.min_duration = 4000 #both in miliseconds
         self.max_duration = 10000
+        self.chunk_workers = 1  #parallel chunking processes
+        self.streaming_split = False  #memory-mapped splitting for very long files
+        self.virtual_chunks = False  #record chunk ranges instead of writing chunk files
+        self.segmenter = AudioSplitter.SEGMENTER_NUMPY  #speech detection backend for chunking
         self.metadata = self._load_metadata()
 
         #denoiser values
@@ -27,6 +32,16 @@ class LJSpeechDatasetUI:
         self.silence_threshold = 0.1
         self.noise_reduction_strength = 0.6
         self.use_spectral_gating = False  #pytorch spectral gating
+        self.denoise_workers = 1  #parallel denoising processes
+        self.streaming_denoise = False  #block-wise denoising for very long files
+        self.gate_batch_size = 1  #files per torch spectral gating batch (1 = per-file)
+        self.shared_profile = False  #one noise profile per source recording across its chunks
+        self.use_ledger = True  #skip files the processing ledger marks as already done
+        self.resume_transcription = True  #continue an interrupted Auto Transcript run from its journal
+        self.use_transcript_cache = True  #reuse transcripts of identical audio under any file name
+        self.warm_up_asr = True  #load the default ASR model in the background when the WebUI starts
+        self.model_pool_ram_gb = 4  #host RAM kept for loaded ASR models between runs
+        self.model_pool_vram_gb = 4  #VRAM kept for loaded ASR models on each GPU
 
     def _load_metadata(self):
         if os.path.exists(self.metadata_file):
@@ -43,7 +58,7 @@ class LJSpeechDatasetUI:
         if not os.path.exists(self.dataset_dir):
             return []
 
-        audio_files = sorted(f for f in os.listdir(self.dataset_dir) if f.lower().endswith(".wav"))
+        audio_files = sorted(list_dataset_audio(self.dataset_dir), key=lambda f: f.name)
         if len(audio_files) == 0:
             return []
 
@@ -52,7 +67,10 @@ class LJSpeechDatasetUI:
         else:
             meta_map = {}
 
-        return [(os.path.join(self.dataset_dir, af), meta_map.get(af, "")) for af in audio_files]
+        return [
+            (af if isinstance(af, VirtualChunk) else os.path.join(self.dataset_dir, af.name), meta_map.get(af.name, ""))
+            for af in audio_files
+        ]
 
     def update_metadata(self, audio_file, new_transcript):
         base_name = os.path.basename(audio_file)
@@ -133,7 +151,13 @@ class LJSpeechDatasetUI:
             for i in range(items_per_page):
                 if i < len(page_data):
                     audio_file, transcript = page_data[i]
-                    audio_update = gr.update(value=audio_file, visible=True)
+                    if isinstance(audio_file, VirtualChunk):
+                        #virtual chunks are played from their source range
+                        data, sample_rate = audio_file.read(dtype="int16")
+                        audio_update = gr.update(value=(sample_rate, data), visible=True)
+                        audio_file = audio_file.name
+                    else:
+                        audio_update = gr.update(value=audio_file, visible=True)
                     transcript_update = gr.update(value=transcript, visible=True)
                     save_btn_update = gr.update(visible=True)
                     status_box_update = gr.update(value="", visible=True)
@@ -164,7 +188,7 @@ class LJSpeechDatasetUI:
             dataset_path = Path(self.dataset_dir)
             if not dataset_path.exists():
                 return ""
-            audio_files = sorted(f.name for f in dataset_path.iterdir() if f.suffix.lower() == '.wav')
+            audio_files = sorted(f.name for f in list_dataset_audio(dataset_path))
             return "\n".join(audio_files)
         
         def handle_upload(file_paths, auto_convert_mp3):
@@ -215,6 +239,10 @@ class LJSpeechDatasetUI:
                     with gr.Column():
                         pp_main = gr.Button("Step 3 - Auto Transcript", variant="primary")
                         gr.Markdown("The final step or preprocessing. This will generate the metadata.csv file.")
+                        pp_long_form = gr.Button("Single Pass - Chunk + Transcribe", variant="secondary")
+                        gr.Markdown("Alternative to steps 1 and 3: transcribes each long recording once with word timestamps, cuts chunks between words within the chunking durations and writes metadata.csv. Requires the local ASR engine.")
+                        pp_fused = gr.Button("Fused - Chunk + Filter + Transcribe", variant="secondary")
+                        gr.Markdown("Alternative to steps 1 to 3: decodes each recording once, chunks and denoises it in memory, writes every chunk once and transcribes straight from memory. Uses the chunking, denoiser and ASR settings below (no streaming, worker processes or batched gating).")
 
                 with gr.Row():
 
@@ -258,6 +286,36 @@ class LJSpeechDatasetUI:
                             value=self.use_spectral_gating
                         )
 
+                        denoise_workers_slider = gr.Slider(
+                            label="Denoising Workers",
+                            info="Number of files denoised in parallel (separate processes).",
+                            minimum=1,
+                            maximum=max(1, os.cpu_count() or 1),
+                            step=1,
+                            value=self.denoise_workers
+                        )
+
+                        streaming_denoise = gr.Checkbox(
+                            label="Streaming Denoise",
+                            info="Denoise long files block by block with constant memory. Output matches the regular path.",
+                            value=self.streaming_denoise
+                        )
+
+                        gate_batch_size = gr.Slider(
+                            label="Spectral Gating Batch Size",
+                            info="Files denoised per PyTorch TorchGate batch when spectral gating is on (1 = per-file, needs torch).",
+                            minimum=1,
+                            maximum=64,
+                            step=1,
+                            value=self.gate_batch_size
+                        )
+
+                        shared_profile = gr.Checkbox(
+                            label="Shared Noise Profile",
+                            info="Estimate one noise profile per recording from the quiet parts of all its chunks; switches those chunks to the stationary gate.",
+                            value=self.shared_profile
+                        )
+
                         save_denoiser = gr.Button("Save", variant="secondary")
 
                     with gr.Column():
@@ -278,12 +336,59 @@ class LJSpeechDatasetUI:
                             value=self.max_duration
                         )
 
-                        save_dur = gr.Button("Save", variant="secondary")
+                        segmenter_dropdown = gr.Dropdown(
+                            label="Speech Detection",
+                            info="Energy threshold (fast) or Silero VAD (robust on noisy recordings).",
+                            choices=AudioSplitter.AVAILABLE_SEGMENTERS,
+                            value=self.segmenter,
+                        )
+
+                        chunk_workers_slider = gr.Slider(
+                            label="Chunking Workers",
+                            info="Number of files split in parallel (separate processes).",
+                            minimum=1,
+                            maximum=max(1, os.cpu_count() or 1),
+                            step=1,
+                            value=self.chunk_workers
+                        )
+
+                        streaming_split = gr.Checkbox(
+                            label="Streaming Split",
+                            info="Memory-map files and write chunks as they are found. Keeps memory use flat on multi-hour recordings.",
+                            value=self.streaming_split
+                        )
+
+                        virtual_chunks = gr.Checkbox(
+                            label="Virtual Chunks",
+                            info="Record chunk ranges in a manifest instead of writing chunk files. Chunks are written when the dataset is packaged.",
+                            value=self.virtual_chunks
+                        )
+
+                        with gr.Row():
+                            save_dur = gr.Button("Save", variant="secondary")
+                            preview_dur = gr.Button("Preview", variant="secondary")
                     
                         gr.Markdown("**Separator Controls**")
                         separator_val = gr.Textbox(label="Separator", value="|", interactive=True)
                         save_sep = gr.Button("Save", variant="secondary")
 
+                        gr.Markdown("**Incremental Runs**")
+                        use_ledger = gr.Checkbox(
+                            label="Skip Unchanged Files",
+                            info="Skip files already denoised or transcribed with the same settings (tracked in ledger.db).",
+                            value=self.use_ledger
+                        )
+                        resume_transcription = gr.Checkbox(
+                            label="Resume Interrupted Run",
+                            info="Auto Transcript keeps files finished by a crashed or stopped run (tracked in metadata.csv.journal).",
+                            value=self.resume_transcription
+                        )
+                        use_transcript_cache = gr.Checkbox(
+                            label="Reuse Cached Transcripts",
+                            info="Auto Transcript reuses the transcript of identical audio under any name (cache/transcripts.db), independent of Skip Unchanged Files.",
+                            value=self.use_transcript_cache
+                        )
+
                         gr.Markdown("**ASR Settings**")
                         asr_engine = gr.Dropdown(
                             label="ASR Engine",
@@ -324,27 +429,62 @@ class LJSpeechDatasetUI:
                             step=1,
                             value=1,
                         )
+                        asr_batch_size = gr.Slider(
+                            label="Cross-File Batch Size (local only)",
+                            minimum=1,
+                            maximum=64,
+                            step=1,
+                            value=1,
+                        )
+                        asr_pack_windows = gr.Checkbox(
+                            label="Pack Short Chunks into 30 s Windows (local only)",
+                            value=False,
+                        )
+                        asr_pin_language = gr.Checkbox(
+                            label="Pin Language per Recording (local, auto language)",
+                            value=True,
+                        )
+                        asr_pool_ram_gb = gr.Slider(
+                            label="Loaded Model RAM Budget (GB)",
+                            minimum=0,
+                            maximum=64,
+                            step=0.5,
+                            value=self.model_pool_ram_gb,
+                        )
+                        asr_pool_vram_gb = gr.Slider(
+                            label="Loaded Model VRAM Budget per GPU (GB)",
+                            minimum=0,
+                            maximum=80,
+                            step=0.5,
+                            value=self.model_pool_vram_gb,
+                        )
+                        save_asr = gr.Button("Save", variant="secondary")
                         
                     with gr.Column():
                         gr.Markdown("**Settings Status**")
                         settings_update = gr.Textbox(label="Output", lines=4, interactive=False)
                         settings_curr = gr.Textbox(
                             label="Current Settings",
-                            value=f"""Denoiser Settings:\nFrame Length: {self.frame_length}\nHop Length: {self.hop_length}\nSilence Threshold: {self.silence_threshold}\nNoise Reduction Strength: {self.noise_reduction_strength}\nUse Spectral Gating: {self.use_spectral_gating}\n\nChunking Duration:\nMinimum: {self.min_duration} ms | Maximum: {self.max_duration} ms\n\nSeparator:\n{self.separator}""",
+                            value=f"""Denoiser Settings:\nFrame Length: {self.frame_length}\nHop Length: {self.hop_length}\nSilence Threshold: {self.silence_threshold}\nNoise Reduction Strength: {self.noise_reduction_strength}\nUse Spectral Gating: {self.use_spectral_gating}\nWorkers: {self.denoise_workers}\nStreaming: {self.streaming_denoise}\nGating Batch Size: {self.gate_batch_size}\nShared Profile: {self.shared_profile}\n\nChunking Duration:\nMinimum: {self.min_duration} ms | Maximum: {self.max_duration} ms | Workers: {self.chunk_workers} | Streaming: {self.streaming_split} | Virtual: {self.virtual_chunks}\nSpeech Detection: {self.segmenter}\n\nSeparator:\n{self.separator}""",
                             lines=12, interactive=False
                         )
                     
                     with gr.Column():
                         gr.Markdown("**Settings Information**")
                         gr.Markdown("""**Denoiser:**
-Parameter adjustments to filter background noise.
+Parameter adjustments to filter background noise. Denoising Workers cleans several files at once on multi-core machines. Streaming Denoise keeps memory flat on very long, un-chunked recordings. Spectral Gating Batch Size above 1 runs spectral gating through PyTorch on batches of similar-length chunks, using Denoising Workers as torch threads. Shared Noise Profile pools the quiet frames of every chunk of a recording into one profile and gates those chunks with noisereduce's stationary algorithm against it, instead of the default non-stationary gate that estimates noise from each chunk alone.
 
 **Chunking:**
-Adjust the minimum and maximum duration for splitting audio files. Splits at silence boundaries to avoid cutting mid-speech.
+Adjust the minimum and maximum duration for splitting audio files. Splits at silence boundaries to avoid cutting mid-speech. Chunking Workers splits several files at once on multi-core machines. Streaming Split keeps memory flat on very long recordings. Virtual Chunks skips writing chunk files until packaging; denoising writes each chunk out as its own file and never modifies the source recording. Preview reports the chunk count and duration histogram without writing anything; detected speech regions are cached, so re-tuning the durations is instant. Speech Detection picks the energy threshold or the Silero VAD model bundled with faster-whisper; Preview also reports detection throughput and duration spread to compare them.
 
 **Separator:**
 Adjust the separator character for metadata.csv
 
+**Incremental Runs:**
+Skip Unchanged Files keeps a ledger (ledger.db, next to metadata.csv) of each file's content hash and the settings it was denoised or transcribed with. Re-running a step only processes new or changed files; transcripts of unchanged files are reused. Reuse Cached Transcripts keeps transcripts in a content-addressed cache (cache/transcripts.db, 64 MB, least recently used entries dropped first), so the same audio re-uploaded under another name, or shared between projects, is not transcribed twice; the run summary reports the cache hit rate. It works on its own, so Skip Unchanged Files can be turned off to rename or re-upload files while the cache still applies.
+
+Resume Interrupted Run: Auto Transcript appends each finished transcript to metadata.csv.journal (flushed to disk as it arrives) and writes the ordered metadata.csv at the end. If a run crashes or is stopped, the next run with the same ASR settings only transcribes the remaining files. Turn it off to start over.
+
 **ASR Settings:**
 Configure the speech recognition engine.
 
@@ -369,13 +509,19 @@ Configure the speech recognition engine.
   - `float32` — Full precision, safest fallback
 - **CPU ASR Workers**: Number of concurrent transcription workers when running on CPU.
 - **GPU Workers Per Device**: Number of concurrent workers per visible CUDA GPU.
+- **Cross-File Batch Size**: Step 3 only. Speech segments from this many files are decoded together in one batch instead of one file at a time. Short chunks hold a single segment each, so this is what fills the batch. `1` keeps file-by-file transcription.
+- **Pack Short Chunks into 30 s Windows**: Step 3 only. Whisper pads every input to 30 seconds, so several short chunks are joined with 1 s of silence and transcribed as one window. The text is split back to each chunk by word timings. This needs far fewer encoder passes. With `auto` language, each window gets a single detected language, so pin the language for mixed-language datasets.
+- **Pin Language per Recording**: With `auto` language, chunks cut from the same recording (`<name>_processedN`) stop running language detection after 3 of them were detected as the same language at 80% or more. A recording with confident detections of two different languages keeps detecting on every chunk.
+- **Loaded Model RAM / VRAM Budget**: Memory kept for models between runs. CPU models count against the RAM budget, and each GPU has its own VRAM budget. `0` keeps only the most recently loaded model on each device.
+- **Save**: Loads the model for these settings in the background so the next run starts transcribing right away. Loaded models stay in memory between runs, within the budgets above (the least recently used are dropped first). The default model is also loaded when the WebUI starts.
 
 **You should leave all of these options alone if you don't understand them.**""")
 
                 pp_status = gr.Textbox(label="Output", lines=10, interactive=False)
             
-                pp_filter.click(noise_reducer.gradio_run, inputs=[frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating], outputs=pp_status)
-                pp_chunk.click(splitter.gradio_run, inputs=[min_duration_slider, max_duration_slider], outputs=pp_status)
+                pp_filter.click(noise_reducer.gradio_run, inputs=[frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating, denoise_workers_slider, streaming_denoise, gate_batch_size, shared_profile, use_ledger], outputs=pp_status)
+                preview_dur.click(splitter.gradio_preview, inputs=[min_duration_slider, max_duration_slider, streaming_split, segmenter_dropdown], outputs=pp_status)
+                pp_chunk.click(splitter.gradio_run, inputs=[min_duration_slider, max_duration_slider, chunk_workers_slider, streaming_split, virtual_chunks, segmenter_dropdown], outputs=pp_status)
                 pp_main.click(
                     main_process.gradio_run,
                     inputs=[
@@ -387,6 +533,51 @@ Configure the speech recognition engine.
                         asr_compute_type,
                         asr_cpu_workers,
                         asr_gpu_workers_per_device,
+                        use_ledger,
+                        asr_batch_size,
+                        asr_pack_windows,
+                        resume_transcription,
+                        asr_pin_language,
+                        use_transcript_cache,
+                    ],
+                    outputs=pp_status,
+                )
+                pp_long_form.click(
+                    main_process.gradio_run_long_form,
+                    inputs=[
+                        min_duration_slider,
+                        max_duration_slider,
+                        separator_val,
+                        asr_engine,
+                        asr_model_size,
+                        asr_language,
+                        asr_device,
+                        asr_compute_type,
+                        asr_cpu_workers,
+                        asr_gpu_workers_per_device,
+                        use_ledger,
+                    ],
+                    outputs=pp_status,
+                )
+                pp_fused.click(
+                    main_process.gradio_run_fused,
+                    inputs=[
+                        min_duration_slider,
+                        max_duration_slider,
+                        frame_length,
+                        hop_length,
+                        silence_threshold,
+                        noise_reduction_strength,
+                        use_spectral_gating,
+                        separator_val,
+                        asr_engine,
+                        asr_model_size,
+                        asr_language,
+                        asr_device,
+                        asr_compute_type,
+                        asr_cpu_workers,
+                        asr_gpu_workers_per_device,
+                        use_ledger,
                     ],
                     outputs=pp_status,
                 )
@@ -397,33 +588,48 @@ Configure the speech recognition engine.
                     self.separator = new_sep
                     return f"Separator updated to: \n{new_sep}"
                 
-                def update_duration(min_duration, max_duration):
+                def update_duration(min_duration, max_duration, chunk_workers, streaming, virtual, segmenter):
                     if min_duration > max_duration:
                         return "Minimum duration cannot be greater than maximum duration."
                     self.min_duration = min_duration
                     self.max_duration = max_duration
-                    return f"Duration updated to: \n{min_duration}ms (min) \n{max_duration}ms (max)"
+                    self.chunk_workers = int(chunk_workers)
+                    self.streaming_split = streaming
+                    self.virtual_chunks = virtual
+                    self.segmenter = segmenter
+                    return f"Duration updated to: \n{min_duration}ms (min) \n{max_duration}ms (max) \nWorkers: {self.chunk_workers} \nStreaming: {self.streaming_split} \nVirtual: {self.virtual_chunks} \nSpeech Detection: {self.segmenter}"
                 
-                def update_denoiser(frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating):
+                def update_denoiser(frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating, denoise_workers, streaming, batch_size, shared):
                     self.frame_length = frame_length
                     self.hop_length = hop_length
                     self.silence_threshold = silence_threshold
                     self.noise_reduction_strength = noise_reduction_strength
                     self.use_spectral_gating = use_spectral_gating
+                    self.denoise_workers = int(denoise_workers)
+                    self.streaming_denoise = streaming
+                    self.gate_batch_size = int(batch_size)
+                    self.shared_profile = shared
 
-                    return f"Denoiser settings updated: \nFrame Length: {self.frame_length}, \nHop Length: {self.hop_length}, \nSilence Threshold: {self.silence_threshold}, \nNoise Reduction Strength: {self.noise_reduction_strength}, \nUse Spectral Gating: {self.use_spectral_gating}"
+                    return f"Denoiser settings updated: \nFrame Length: {self.frame_length}, \nHop Length: {self.hop_length}, \nSilence Threshold: {self.silence_threshold}, \nNoise Reduction Strength: {self.noise_reduction_strength}, \nUse Spectral Gating: {self.use_spectral_gating}, \nWorkers: {self.denoise_workers}, \nStreaming: {self.streaming_denoise}, \nGating Batch Size: {self.gate_batch_size}, \nShared Profile: {self.shared_profile}"
 
                 def update_settings_display():
-                    return f"""Denoiser Settings:\nFrame Length: {self.frame_length}\nHop Length: {self.hop_length}\nSilence Threshold: {self.silence_threshold}\nNoise Reduction Strength: {self.noise_reduction_strength}\nUse Spectral Gating: {self.use_spectral_gating}\n\nChunking Duration:\nMinimum: {self.min_duration} ms | Maximum: {self.max_duration} ms\n\nSeparator:\n{self.separator}"""
+                    return f"""Denoiser Settings:\nFrame Length: {self.frame_length}\nHop Length: {self.hop_length}\nSilence Threshold: {self.silence_threshold}\nNoise Reduction Strength: {self.noise_reduction_strength}\nUse Spectral Gating: {self.use_spectral_gating}\nWorkers: {self.denoise_workers}\nStreaming: {self.streaming_denoise}\nGating Batch Size: {self.gate_batch_size}\nShared Profile: {self.shared_profile}\n\nChunking Duration:\nMinimum: {self.min_duration} ms | Maximum: {self.max_duration} ms | Workers: {self.chunk_workers} | Streaming: {self.streaming_split} | Virtual: {self.virtual_chunks}\nSpeech Detection: {self.segmenter}\n\nSeparator:\n{self.separator}"""
 
                 save_sep.click(update_separator, inputs=[separator_val], outputs=settings_update)
-                save_dur.click(update_duration, inputs=[min_duration_slider, max_duration_slider], outputs=settings_update)
-                save_denoiser.click(update_denoiser, inputs=[frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating], outputs=settings_update)
+                save_dur.click(update_duration, inputs=[min_duration_slider, max_duration_slider, chunk_workers_slider, streaming_split, virtual_chunks, segmenter_dropdown], outputs=settings_update)
+                save_denoiser.click(update_denoiser, inputs=[frame_length, hop_length, silence_threshold, noise_reduction_strength, use_spectral_gating, denoise_workers_slider, streaming_denoise, gate_batch_size, shared_profile], outputs=settings_update)
                 
                 save_sep.click(fn=update_settings_display, inputs=[], outputs=settings_curr)
                 save_dur.click(fn=update_settings_display, inputs=[], outputs=settings_curr)
                 save_denoiser.click(fn=update_settings_display, inputs=[], outputs=settings_curr)
 
+                asr_model_inputs = [asr_engine, asr_model_size, asr_language, asr_device, asr_compute_type, asr_cpu_workers, asr_gpu_workers_per_device, asr_pool_ram_gb, asr_pool_vram_gb]
+                save_asr.click(main_process.warm_up, inputs=asr_model_inputs, outputs=settings_update)
+                main_process.set_model_pool_budgets(self.model_pool_ram_gb, self.model_pool_vram_gb)
+                if self.warm_up_asr:
+                    #the first Auto Transcript then finds the default model already loaded
+                    main_process.warm_up(*[component.value for component in asr_model_inputs])
+
             with gr.Tab("Transcript Editing"):
                 components = []
 